@@ -0,0 +1,9 @@
+"""Combined MCP server for all of the Adobe applications."""
+
+from .server import mcp, run
+
+def main():
+    """Entry point for the combined MCP server."""
+    run()
+
+__all__ = ["mcp", "main"]
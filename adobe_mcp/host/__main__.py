@@ -0,0 +1,5 @@
+"""Main entry point for the combined MCP server."""
+from .server import run
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,123 @@
+# MIT License
+#
+# Copyright (c) 2025 Mike Chambers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+One MCP server for Photoshop, Premiere, InDesign and Illustrator.
+
+Each application's tools and resources are mounted under its name, so
+get_documents from the Photoshop server becomes photoshop_get_documents.
+Running them in one process means one interpreter, one copy of the imaging
+and font libraries, one connection to the command proxy, one font index and
+one document state cache, instead of one of each per application.
+"""
+
+import functools
+import sys
+
+from pydantic import AnyUrl
+from mcp.server.fastmcp import FastMCP
+
+from ..shared.core import current_application
+from ..shared.fonts import font_discovery
+from ..photoshop import server as photoshop
+from ..premiere import server as premiere
+from ..indesign import server as indesign
+from ..illustrator.bridge import execute_script, start_command_server
+
+mcp_name = "Adobe MCP Server"
+mcp = FastMCP(mcp_name, log_level="ERROR", instructions="""
+    Tools and resources for Photoshop, Premiere Pro, InDesign and Illustrator, each prefixed with the
+    application it controls, such as photoshop_get_documents. Read config://<application>/get_instructions
+    before using an application. Tool descriptions and instructions refer to other tools of the same
+    application without the prefix.
+    """)
+print(f"{mcp_name} running on stdio", file=sys.stderr)
+
+# Servers whose tools are mounted, by the application name their tools are
+# prefixed with
+APPLICATION_SERVERS = {
+    photoshop.APPLICATION: photoshop.mcp,
+    premiere.APPLICATION: premiere.mcp,
+    indesign.APPLICATION: indesign.mcp,
+}
+
+
+def bind_application(fn, application):
+    """
+    Returns a version of an async tool function that creates its commands
+    for the application, whichever server was imported last.
+    """
+    @functools.wraps(fn)
+    async def bound(*args, **kwargs):
+        token = current_application.set(application)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            current_application.reset(token)
+
+    return bound
+
+
+def mount(application, server):
+    """
+    Adds the tools and resources of an application's server to the host,
+    prefixed with the application name.
+
+    Tools are copied with the schemas the server already built, so mounting
+    is cheap.
+    """
+    for tool in server._tool_manager.list_tools():
+        name = f"{application}_{tool.name}"
+        mcp._tool_manager._tools[name] = tool.model_copy(update={
+            "name": name,
+            "fn": bind_application(tool.fn, application),
+        })
+
+    for resource in server._resource_manager.list_resources():
+        # config://get_instructions becomes config://photoshop/get_instructions
+        scheme, path = str(resource.uri).split("://", 1)
+        mcp.add_resource(resource.model_copy(update={
+            "uri": AnyUrl(f"{scheme}://{application}/{path}"),
+            "name": f"{application}_{resource.name}",
+        }))
+
+
+for application, server in APPLICATION_SERVERS.items():
+    mount(application, server)
+
+# Illustrator runs scripts through its own command box rather than the proxy
+mcp.tool(name="illustrator_execute_script")(execute_script)
+
+
+def run():
+    """Starts finding fonts and the Illustrator command box, and serves MCP on stdio."""
+    font_discovery.start()
+
+    try:
+        start_command_server()
+    except OSError as e:
+        # Usually a standalone Illustrator server already has the port, and
+        # scripts posted to it still reach the plugin
+        print(f"Illustrator command box not started: {e}", file=sys.stderr)
+
+    mcp.run()
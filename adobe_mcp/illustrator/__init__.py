@@ -1,9 +1,16 @@
 """Adobe Illustrator MCP Server with integrated proxy."""
 
-from .server import mcp, run_server
-
 def main():
     """Entry point for Illustrator MCP server."""
+    from .server import run_server
     run_server()
 
+def __getattr__(name):
+    # The server needs fastmcp, which the combined host does not use, so it
+    # is imported only when asked for
+    if name in ("mcp", "run_server"):
+        from . import server
+        return getattr(server, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = ["mcp", "main", "run_server"]
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Command box shared by the Illustrator UXP plugin and the MCP tools.
+
+The plugin polls a small HTTP server for the next script to run, and the
+tools post scripts to it. It needs no MCP library, so both the Illustrator
+server and the combined host can use it.
+"""
+
+import http.server
+import json
+import socketserver
+import threading
+from http import HTTPStatus
+
+import httpx
+
+# --- Part 1: Command Proxy Server Logic ---
+# This part of the code runs a simple, synchronous HTTP server in its own thread
+# to act as a message box for the UXP plugin.
+
+COMMAND_PORT = 8001
+PROXY_POST_URL = f"http://127.0.0.1:{COMMAND_PORT}/command"
+
+
+class CommandStore:
+    """A thread-safe class to store the latest command."""
+
+    def __init__(self):
+        self.script = None
+        self.lock = threading.Lock()
+
+    def set_script(self, script):
+        with self.lock:
+            self.script = script
+
+    def get_and_clear_script(self):
+        with self.lock:
+            script = self.script
+            self.script = None
+            return script
+
+
+command_store = CommandStore()
+
+
+class ProxyHandler(http.server.SimpleHTTPRequestHandler):
+    """Handles GET requests from the UXP plugin and POST requests from the MCP server."""
+
+    def do_POST(self):
+        if self.path == "/command":
+            try:
+                content_length = int(self.headers["Content-Length"])
+                data = json.loads(self.rfile.read(content_length))
+                command_store.set_script(data.get("script"))
+                self._send_response(HTTPStatus.OK, {"status": "command received"})
+            except Exception as e:
+                self._send_response(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+        else:
+            self._send_response(HTTPStatus.NOT_FOUND, {"error": "Not Found"})
+
+    def do_GET(self):
+        if self.path == "/command":
+            script = command_store.get_and_clear_script()
+            self._send_response(HTTPStatus.OK, {"script": script})
+        else:
+            self._send_response(HTTPStatus.NOT_FOUND, {"error": "Not Found"})
+
+    def _send_response(self, status, content):
+        self.send_response(status)
+        self.send_header("Content-type", "application/json")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(json.dumps(content).encode("utf-8"))
+
+
+def start_command_server(port=COMMAND_PORT):
+    """
+    Starts the command box on a background thread.
+
+    Returns:
+        socketserver.TCPServer: The running server. Call shutdown() to stop it.
+    """
+    proxy_server = socketserver.TCPServer(("", port), ProxyHandler)
+    proxy_thread = threading.Thread(target=proxy_server.serve_forever)
+    proxy_thread.daemon = True
+    proxy_thread.start()
+    return proxy_server
+
+
+async def execute_script(script: str) -> str:
+    """Sends a JavaScript string to be executed inside Adobe Illustrator."""
+    async with httpx.AsyncClient() as client:
+        try:
+            await client.post(PROXY_POST_URL, json={"script": script})
+            return "Success: Command forwarded to Illustrator."
+        except httpx.RequestError as e:
+            return f"Error: Cannot connect to proxy server. Is it running? Details: {e}"
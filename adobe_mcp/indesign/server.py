@@ -21,7 +21,7 @@
 # SOFTWARE.
 
 from mcp.server.fastmcp import FastMCP
-from ..shared import init, sendCommand, createCommand, socket_client
+from ..shared import init, send_command, createCommand, socket_client
 import sys
 
 #logger.log(f"Python path: {sys.executable}")
@@ -48,7 +48,7 @@ socket_client.configure(
 init(APPLICATION, socket_client)
 
 @mcp.tool()
-def create_document(
+async def create_document(
     width:int, height:int, pages:int = 0,
     pages_facing:bool = False,
     columns:dict = {"count":1, "gutter":12},
@@ -64,7 +64,7 @@ def create_document(
         "pagesFacing":pages_facing
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.resource("config://get_instructions")
 def get_instructions() -> str:
@@ -1,10 +1,9 @@
 """Adobe Photoshop MCP Server."""
 
-from .server import mcp
+from .server import mcp, run
 
 def main():
     """Entry point for Photoshop MCP server."""
-    import sys
-    mcp.run(sys.stdin.buffer, sys.stdout.buffer)
+    run()
 
 __all__ = ["mcp", "main"]
\ No newline at end of file
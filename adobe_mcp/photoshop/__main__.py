@@ -1,6 +1,5 @@
 """Main entry point for Photoshop MCP server."""
-import sys
-from .server import mcp
+from .server import run
 
 if __name__ == "__main__":
-    mcp.run(sys.stdin.buffer, sys.stdout.buffer)
\ No newline at end of file
+    run()
\ No newline at end of file
@@ -0,0 +1,320 @@
+# MIT License
+#
+# Copyright (c) 2025 Mike Chambers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Captures of the document's pixels, whole or one region at a time."""
+
+from ..shared import createCommand, send_command
+import asyncio
+import os
+import threading
+import time
+
+from ..shared.imaging import (
+    block_hashes,
+    block_hashes_async,
+    dirty_regions,
+    IMAGE_EXTENSIONS,
+    export_layer_png,
+    export_variant_async,
+    get_process_pool,
+    parse_size,
+    pixels_from_buffer,
+    WHITE,
+)
+
+# Default width and height of the tiles iter_document_tiles reads
+TILE_SIZE = 1024
+
+# Width and height of the blocks CaptureCache compares, in captured pixels
+BLOCK_SIZE = 32
+
+
+def tile_bounds(width, height, tile_size=TILE_SIZE):
+    """
+    Splits a canvas into tiles, row by row. Tiles on the right and bottom
+    edges are smaller if the canvas is not a multiple of tile_size.
+
+    Yields:
+        dict: {"left", "top", "right", "bottom"} of each tile, in pixels
+    """
+    for top in range(0, height, tile_size):
+        for left in range(0, width, tile_size):
+            yield {
+                "left": left,
+                "top": top,
+                "right": min(left + tile_size, width),
+                "bottom": min(top + tile_size, height),
+            }
+
+
+async def get_region(bounds, scale=1.0, format="jpeg"):
+    """
+    Reads a rectangle of the active document's composite image.
+
+    Args:
+        bounds (dict): {"left", "top", "right", "bottom"} in pixels. Clipped to the canvas.
+        scale (float): Scale to read the region at. 1 is full resolution.
+        format (str): "jpeg", or "raw" for uncompressed pixels
+
+    Returns:
+        dict: The plugin's response, with 'imageData', 'width', 'height',
+            'components' and the clipped 'bounds'. Raw captures also have
+            'pixels', a (height, width, components) uint8 array over imageData.
+    """
+    command = createCommand("getDocumentRegion", {
+        "bounds":bounds,
+        "scale":scale,
+        "format":format
+    }, snapshot="none")
+
+    response = await send_command(command)
+    region = response["response"]
+
+    if format == "raw":
+        region["pixels"] = pixels_from_buffer(
+            region["imageData"], region["width"], region["height"], region["components"]
+        )
+
+    return region
+
+
+async def iter_document_tiles(tile_size=TILE_SIZE, scale=1.0, format="raw"):
+    """
+    Reads the whole active document one tile at a time, so documents too
+    large to capture at once can be processed with only one tile in memory.
+
+    Args:
+        tile_size (int): Width and height of each tile, in document pixels
+        scale (float): Scale to read the tiles at. 1 is full resolution.
+        format (str): "raw" for uncompressed pixels, or "jpeg"
+
+    Yields:
+        dict: Each tile, as returned by get_region
+    """
+    command = createCommand("getDocumentInfo", {}, snapshot="none")
+    info = (await send_command(command))["response"]
+
+    for bounds in tile_bounds(int(info["width"]), int(info["height"]), tile_size):
+        yield await get_region(bounds, scale, format)
+
+
+async def export_layers(layers_info, crop=False):
+    """
+    Saves each layer as a PNG file.
+
+    Photoshop reads every layer's pixels in one pass and streams them back
+    one layer at a time. Each layer is cropped or placed on the canvas, and
+    encoded, in a worker process as soon as it arrives, so exports use
+    every core.
+
+    Args:
+        layers_info (list): Dicts with the 'layerId' to export and the
+            'filePath' to save it to
+        crop (bool): Whether to crop each PNG to the layer's visible pixels,
+            rather than saving it at the size of the document
+
+    Returns:
+        list: A dict per layer, in the order given, with 'layerId' and
+            'success', and either the saved 'filePath', 'width', 'height' and
+            'bounds' or a 'message' saying why it failed
+    """
+    paths = {info["layerId"]: info["filePath"] for info in layers_info}
+    pool = get_process_pool()
+    exports = {}
+
+    def on_chunk(chunk):
+        layer_id = chunk["layerId"]
+        exports[layer_id] = pool.submit(
+            export_layer_png,
+            bytes(chunk["imageData"]),
+            chunk["width"],
+            chunk["height"],
+            chunk["components"],
+            chunk["bounds"],
+            chunk["canvas"],
+            crop,
+            paths[layer_id],
+        )
+
+    command = createCommand("getLayerPixels", {
+        "layerIds":list(paths)
+    }, snapshot="none")
+
+    response = await send_command(command, on_chunk=on_chunk)
+    read = {r["layerId"]: r for r in response["response"]}
+
+    results = []
+    for info in layers_info:
+        layer_id = info["layerId"]
+        result = {"layerId": layer_id}
+
+        try:
+            if layer_id not in exports:
+                message = read.get(layer_id, {}).get("message", "No pixels received for layer")
+                raise RuntimeError(message)
+
+            result.update(await asyncio.wrap_future(exports[layer_id]))
+            result["success"] = True
+        except Exception as e:
+            result.update({"filePath": info["filePath"], "success": False, "message": str(e)})
+
+        results.append(result)
+
+    return results
+
+
+async def export_variants(sizes, formats, out_dir, base_name=None, quality=None, background=WHITE):
+    """
+    Saves the document at several sizes and in several formats from a
+    single capture.
+
+    The full resolution pixels are read from Photoshop once. Every variant
+    is then resized, encoded and written on worker threads, in parallel.
+
+    Args:
+        sizes (list): Size specs, such as "1x", "2x" or "256px" (see parse_size)
+        formats (list): Formats to save each size in: "png", "jpeg" or "webp"
+        out_dir (str): Existing directory to write the files to
+        base_name (str): Start of each file name. Defaults to the document name.
+        quality (int): Quality from 1 to 100 for jpeg and webp
+        background (tuple): (red, green, blue) color transparent pixels are
+            composited onto for jpeg
+
+    Returns:
+        dict: 'captureMs', the time taken to read the pixels, and 'variants',
+            a dict per variant with its file, dimensions, byte size and timings
+            (see export_variant), in the order they finished
+    """
+    for format in formats:
+        if format not in IMAGE_EXTENSIONS:
+            raise ValueError(f"Unsupported image format : {format}. Valid values are: {', '.join(IMAGE_EXTENSIONS)}")
+
+    if not os.path.isdir(out_dir):
+        raise ValueError(f"Output directory does not exist : {out_dir}")
+
+    start = time.perf_counter()
+
+    command = createCommand("getDocumentImage", {
+        "format":"raw"
+    }, snapshot="summary")
+    response = await send_command(command)
+
+    image_data = response["response"]
+    pixels = pixels_from_buffer(
+        image_data["imageData"], image_data["width"], image_data["height"], image_data["components"]
+    )
+    capture_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    # Check every size before writing anything
+    for size in sizes:
+        parse_size(size, image_data["width"], image_data["height"])
+
+    if not base_name:
+        document = response.get("document") or {}
+        base_name = os.path.splitext(document.get("name") or "document")[0]
+
+    tasks = []
+    for size in sizes:
+        for format in formats:
+            file_name = f"{base_name}@{size}.{IMAGE_EXTENSIONS[format]}"
+            tasks.append(export_variant_async(
+                pixels, size, format, os.path.join(out_dir, file_name), quality, background
+            ))
+
+    variants = []
+    for task in asyncio.as_completed(tasks):
+        variants.append(await task)
+
+    return {
+        "captureMs": capture_ms,
+        "variants": variants,
+    }
+
+
+class CaptureCache:
+    """
+    Remembers the block hashes of the last capture of each document, so the
+    next capture can report which parts of the image changed.
+
+    Only the hashes are kept, not the pixels.
+    """
+
+    def __init__(self, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+
+        # document id -> {"shape", "hashes"}
+        self._captures = {}
+        self._lock = threading.Lock()
+
+    def compare(self, document_id, pixels):
+        """
+        Compares a capture with the previous capture of the same document,
+        and remembers it for next time.
+
+        Args:
+            document_id: ID of the captured document
+            pixels (numpy.ndarray): The capture, as returned by pixels_from_buffer
+
+        Returns:
+            dict: 'baseline' is True if there was no comparable earlier
+                capture. Otherwise 'regions' lists the (left, top, right,
+                bottom) pixel bounds of each changed area.
+        """
+        return self._compare_hashes(document_id, pixels.shape, block_hashes(pixels, self.block_size))
+
+    async def compare_async(self, document_id, pixels):
+        """Version of compare that hashes the capture on a worker thread."""
+        hashes = await block_hashes_async(pixels, self.block_size)
+        return self._compare_hashes(document_id, pixels.shape, hashes)
+
+    def _compare_hashes(self, document_id, shape, hashes):
+        with self._lock:
+            previous = self._captures.get(document_id)
+            self._captures[document_id] = {
+                "shape": shape,
+                "hashes": hashes,
+            }
+
+        if previous is None or previous["shape"] != shape:
+            return {"baseline": True, "regions": []}
+
+        height, width = shape[:2]
+        size = self.block_size
+
+        regions = [
+            (left * size, top * size, min(right * size, width), min(bottom * size, height))
+            for top, left, bottom, right in dirty_regions(hashes != previous["hashes"])
+        ]
+
+        return {
+            "baseline": False,
+            "regions": regions,
+        }
+
+    def forget(self, document_id=None):
+        """Drops the capture of a document, or of all documents."""
+        with self._lock:
+            if document_id is None:
+                self._captures.clear()
+            else:
+                self._captures.pop(document_id, None)
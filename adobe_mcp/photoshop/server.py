@@ -21,14 +21,16 @@
 # SOFTWARE.
 
 from mcp.server.fastmcp import FastMCP, Image
-from ..shared import init, sendCommand, createCommand, list_all_fonts_postscript
+from ..shared import init, send_command, createCommand, createBatch, font_discovery
+from ..shared import document_cache
+from .capture import get_region, export_layers, export_variants as export_document_variants, CaptureCache
+from ..shared.imaging import IMAGE_FORMATS, pixels_from_buffer, encode_image_async, resize_image_async
+from ..shared.text_metrics import get_font_metrics, measure_text as measure_font_text
 from ..shared import socket_client
-import numpy as np
-import base64
+import asyncio
 import sys
 import os
 
-FONT_LIMIT = 1000 #max number of font names to return to AI
 
 #logger.log(f"Python path: {sys.executable}")
 #logger.log(f"PYTHONPATH: {os.environ.get('PYTHONPATH')}")
@@ -53,7 +55,7 @@ socket_client.configure(
 init(APPLICATION, socket_client)
 
 @mcp.tool()
-def set_active_document(document_id:int):
+async def set_active_document(document_id:int):
     """
     Sets the document with the specified ID to the active document in Photoshop
 
@@ -63,24 +65,51 @@ def set_active_document(document_id:int):
 
     command = createCommand("setActiveDocument", {
         "documentId":document_id
-    })
+    }, snapshot="summary")
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def get_documents():
+async def get_documents():
     """
     Returns information on the documents currently open in Photoshop
     """
 
     command = createCommand("getDocuments", {
-    })
+    }, snapshot="none")
+
+    return await send_command(command)
+
+@mcp.tool()
+async def run_batch(commands: list[dict], stop_on_error: bool = True):
+    """
+    Runs an ordered list of Photoshop commands in a single round-trip.
+
+    Use this when building up a document in many small steps (for example creating
+    and styling a series of layers). Document and layer info is returned once,
+    after the last command has run.
+
+    Args:
+        commands (list[dict]): The commands to run, in order. Each dict has:
+            - action (str): The plugin action name, e.g. "createPixelLayer",
+              "renameLayer", "translateLayer", "setLayerProperties".
+            - options (dict): The options for the action, using the same keys the
+              matching tool sends, e.g. {"layerId": 12, "newLayerName": "Title"}.
+        stop_on_error (bool): Whether to skip the remaining commands after one fails.
+            Defaults to True.
 
-    return sendCommand(command)
+    Returns:
+        dict: Response with a "response" list holding one entry per command that ran,
+            each with "action", "status" ("SUCCESS" or "FAILURE") and either
+            "response" or an error "message".
+    """
+
+    command = createBatch(commands, stop_on_error)
 
+    return await send_command(command)
 
 @mcp.tool()
-def create_gradient_layer_style(
+async def create_gradient_layer_style(
     layer_id: int,
     angle: int,
     type:str,
@@ -113,11 +142,11 @@ def create_gradient_layer_style(
         "opacityStops":opacity_stops
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def duplicate_document(document_name: str):
+async def duplicate_document(document_name: str):
     """Duplicates the current Photoshop Document into a new file
 
 
@@ -129,11 +158,11 @@ def duplicate_document(document_name: str):
         "name":document_name
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def create_document(document_name: str, width: int, height:int, resolution:int, fill_color:dict = {"red":0, "green":0, "blue":0}, color_mode:str = "RGB"):
+async def create_document(document_name: str, width: int, height:int, resolution:int, fill_color:dict = {"red":0, "green":0, "blue":0}, color_mode:str = "RGB"):
     """Creates a new Photoshop Document
 
         Layer are created from bottom up based on the order they are created in, so create background elements first and then build on top.
@@ -158,14 +187,19 @@ def create_document(document_name: str, width: int, height:int, resolution:int,
         "colorMode":color_mode
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def export_layers_as_png(layers_info: list[dict[str, str|int]]):
+async def export_layers_as_png(layers_info: list[dict[str, str|int]], crop: bool = False, render_effects: bool = False):
     """Exports multiple layers from the Photoshop document as PNG files.
     
     This function exports each specified layer as a separate PNG image file to its 
-    corresponding file path. The entire layer, including transparent space will be saved.
+    corresponding file path. By default the entire layer, including transparent space, will be saved
+    at the size of the document.
+
+    The pixels of all of the layers are read from Photoshop in one pass and encoded in parallel,
+    so exporting many layers is fast. Layer effects (such as drop shadows and strokes) are not
+    included unless render_effects is True, which saves the document once per layer and is much slower.
     
     Args:
         layers_info (list[dict[str, str|int]]): A list of dictionaries containing the export information.
@@ -175,18 +209,24 @@ def export_layers_as_png(layers_info: list[dict[str, str|int]]):
                 - "filePath" (str): The absolute file path including filename where the PNG
                    will be saved (e.g., "/path/to/directory/layername.png").
                    The parent directory must already exist or the export will fail.
+        crop (bool): Whether to crop each PNG to the visible pixels of its layer.
+        render_effects (bool): Whether to include layer effects, by having Photoshop save the
+            document with only each layer visible. crop is ignored in this mode.
     """
-    
+
+    if not render_effects:
+        return await export_layers(layers_info, crop)
+
     command = createCommand("exportLayersAsPng", {
         "layersInfo":layers_info
-    })
+    }, snapshot="none")
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 
 @mcp.tool()
-def save_document_as(file_path: str, file_type: str = "PSD"):
+async def save_document_as(file_path: str, file_type: str = "PSD"):
     """Saves the current Photoshop document to the specified location and format.
     
     Args:
@@ -206,22 +246,22 @@ def save_document_as(file_path: str, file_type: str = "PSD"):
     command = createCommand("saveDocumentAs", {
         "filePath":file_path,
         "fileType":file_type
-    })
+    }, snapshot="none")
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def save_document():
+async def save_document():
     """Saves the current Photoshop Document
     """
     
     command = createCommand("saveDocument", {
-    })
+    }, snapshot="none")
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def group_layers(group_name: str, layer_ids: list[str]) -> list:
+async def group_layers(group_name: str, layer_ids: list[str]) -> list:
     """
     Creates a new layer group from the specified layers in Photoshop.
 
@@ -242,29 +282,231 @@ def group_layers(group_name: str, layer_ids: list[str]) -> list:
         "layerIds":layer_ids
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def get_document_image():
-    """Returns a jpeg of the current visible Photoshop document as an MCP Image object that can be displayed."""
-    command = createCommand("getDocumentImage", {})
-    response = sendCommand(command)
+async def get_document_image(max_edge: int = 1024, quality: int = None):
+    """Returns a jpeg of the current visible Photoshop document as an MCP Image object that can be displayed.
+
+    By default a preview is returned, scaled down so its longest side is 1024 pixels, which is
+    enough to check the results of an edit and much faster than the full resolution image.
+
+    Args:
+        max_edge (int): Maximum width or height of the image in pixels. Pass 0 for the full
+            resolution image.
+        quality (int): JPEG quality from 1 to 100. By default the image is returned as
+            encoded by Photoshop. Setting it re-encodes the image.
+    """
+    command = createCommand("getDocumentImage", {
+        "maxEdge":max_edge
+    }, snapshot="none")
+    response = await send_command(command)
 
     if response.get('status') == 'SUCCESS' and 'response' in response:
         image_data = response['response']
-        data_url = image_data.get('dataUrl')
 
-        if data_url and data_url.startswith("data:image/jpeg;base64,"):
-            # Strip the data URL prefix and decode the base64 JPEG bytes
-            base64_data = data_url.split(",", 1)[1]
-            jpeg_bytes = base64.b64decode(base64_data)
+        # The JPEG arrives as a binary attachment, so this is already bytes
+        jpeg_bytes = image_data.get('imageData')
 
-            return Image(data=jpeg_bytes, format="jpeg")
+        if jpeg_bytes:
+            # Plugins that predate maxEdge always send the full image
+            too_large = max_edge and max(image_data['width'], image_data['height']) > max_edge
+            if too_large or quality is not None:
+                jpeg_bytes, _, _ = await resize_image_async(jpeg_bytes, max_edge, "jpeg", quality)
+
+            return Image(data=bytes(jpeg_bytes), format="jpeg")
 
     return response
 
 @mcp.tool()
-def save_document_image_as_png(file_path: str):
+async def get_document_region(bounds: dict, scale: float = 1.0):
+    """Returns a jpeg of a rectangle of the current visible Photoshop document as an MCP Image object
+    that can be displayed. Use it to inspect part of a large document, such as the area around
+    a text layer, at full resolution.
+
+    Args:
+        bounds (dict): Region to return, with 'left', 'top', 'right' and 'bottom' keys in pixels.
+            Bounds returned by get_layer_bounds can be passed as is. The region is clipped to
+            the document.
+        scale (float): Scale to return the region at, where 1.0 is full resolution and 0.5 is half.
+
+    Returns:
+        list: A dict with the 'bounds' actually captured, after clipping to the document, and the
+            'width' and 'height' of the image in pixels, followed by the Image.
+    """
+    region = await get_region(bounds, scale, "jpeg")
+
+    return [
+        {"bounds": region["bounds"], "width": region["width"], "height": region["height"]},
+        Image(data=bytes(region["imageData"]), format="jpeg"),
+    ]
+
+capture_cache = CaptureCache()
+
+# Above this many changed regions, or this fraction of the image changed,
+# get_document_changes returns the whole image instead
+MAX_CHANGED_REGIONS = 8
+MAX_CHANGED_FRACTION = 0.5
+
+@mcp.tool()
+async def get_document_changes(max_edge: int = 1024):
+    """Returns only the parts of the current visible Photoshop document that changed since the
+    last call, as MCP Image objects. Use it after an edit to check its effect without looking
+    at the whole document again.
+
+    The first call for a document returns the whole document. If nothing visible changed, no
+    images are returned and 'changed' is False, which usually means the last edit had no effect.
+
+    Args:
+        max_edge (int): Maximum width or height of the capture in pixels. Must be the same as
+            for the previous call for changes to be detected. Pass 0 for full resolution.
+
+    Returns:
+        list: A dict with 'changed' and the 'regions' that changed as 'left', 'top', 'right' and
+            'bottom' document pixel bounds, followed by an Image for each region (or a single
+            Image of the whole document).
+    """
+    command = createCommand("getDocumentImage", {
+        "format":"raw",
+        "maxEdge":max_edge
+    }, snapshot="summary")
+    response = await send_command(command)
+
+    image_data = response['response']
+    pixels = pixels_from_buffer(
+        image_data['imageData'],
+        image_data['width'],
+        image_data['height'],
+        image_data['components']
+    )
+
+    document = response.get('document') or {}
+    result = await capture_cache.compare_async(document.get('id'), pixels)
+
+    # Regions are found in captured pixels and reported in document pixels
+    document_width = (response.get('documentInfo') or {}).get('width', image_data['width'])
+    scale = document_width / image_data['width']
+
+    summary = {
+        'changed': result['baseline'] or len(result['regions']) > 0,
+        'regions': [
+            {
+                'left': round(left * scale),
+                'top': round(top * scale),
+                'right': round(right * scale),
+                'bottom': round(bottom * scale)
+            }
+            for left, top, right, bottom in result['regions']
+        ]
+    }
+
+    if not summary['changed']:
+        summary['message'] = "No visual change since the last capture"
+        return summary
+
+    changed_area = sum((r - l) * (b - t) for l, t, r, b in result['regions'])
+    whole = (
+        result['baseline']
+        or len(result['regions']) > MAX_CHANGED_REGIONS
+        or changed_area > MAX_CHANGED_FRACTION * pixels.shape[0] * pixels.shape[1]
+    )
+
+    crops = [pixels] if whole else [pixels[t:b, l:r] for l, t, r, b in result['regions']]
+    encoded = await asyncio.gather(*(encode_image_async(crop, "jpeg", 85) for crop in crops))
+    images = [Image(data=data, format="jpeg") for data in encoded]
+
+    return [summary, *images]
+
+def rgb_tuple(color):
+    return (color["red"], color["green"], color["blue"])
+
+@mcp.tool()
+async def save_document_image(
+    file_path: str,
+    format: str = "png",
+    quality: int = 90,
+    background: dict = {"red": 255, "green": 255, "blue": 255}
+):
+    """
+    Captures the current visible Photoshop document at full resolution and saves it as an image file.
+
+    The pixels are captured uncompressed, so png files are lossless.
+
+    Args:
+        file_path (str): Where to save the image file
+        format (str): Image format to save as. One of "png", "jpeg" or "webp".
+        quality (int): Quality from 1 to 100 for jpeg and webp. Ignored for png.
+        background (dict): Color that transparent areas are filled with in jpeg files, which
+            can't be transparent, in format of {"red":255, "green":255, "blue":255}.
+
+    Returns:
+        dict: Status, file path, dimensions and size of the saved file
+    """
+    if format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format : {format}. Valid values are: {', '.join(IMAGE_FORMATS)}")
+
+    command = createCommand("getDocumentImage", {
+        "format":"raw"
+    }, snapshot="none")
+    response = await send_command(command)
+
+    image_data = response['response']
+    pixels = pixels_from_buffer(
+        image_data['imageData'],
+        image_data['width'],
+        image_data['height'],
+        image_data['components']
+    )
+
+    encoded = await encode_image_async(pixels, format, quality, rgb_tuple(background))
+
+    with open(file_path, "wb") as f:
+        f.write(encoded)
+
+    return {
+        'status': 'success',
+        'file_path': file_path,
+        'format': format,
+        'width': image_data['width'],
+        'height': image_data['height'],
+        'size_bytes': len(encoded)
+    }
+
+@mcp.tool()
+async def export_variants(
+    sizes: list[str],
+    formats: list[str],
+    out_dir: str,
+    base_name: str = None,
+    quality: int = 90,
+    background: dict = {"red": 255, "green": 255, "blue": 255}
+):
+    """
+    Exports the current visible Photoshop document at several sizes and in several formats, such as
+    1x, 2x and 3x versions and thumbnails for the web. The document is captured once and every
+    variant is resized and encoded in parallel, which is much faster than saving each one separately.
+
+    Files are named <base_name>@<size>.<extension>, for example "hero@2x.png".
+
+    Args:
+        sizes (list[str]): Sizes to export. Each is either a scale of the document size, such as
+            "1x", "2x" or "0.5x", or the length of the longest edge in pixels, such as "256px".
+        formats (list[str]): Formats to export each size in. Any of "png", "jpeg" and "webp".
+        out_dir (str): Absolute path of an existing directory to save the files in.
+        base_name (str): Start of each file name. Defaults to the document name.
+        quality (int): Quality from 1 to 100 for jpeg and webp files.
+        background (dict): Color that transparent areas are filled with in jpeg files, which
+            can't be transparent, in format of {"red":255, "green":255, "blue":255}.
+
+    Returns:
+        dict: 'captureMs', the time taken to capture the document, and 'variants', a list with the
+            'filePath', 'width', 'height', 'bytes' and 'resizeMs', 'encodeMs' and 'writeMs'
+            timings of each file.
+    """
+    return await export_document_variants(sizes, formats, out_dir, base_name, quality, rgb_tuple(background))
+
+@mcp.tool()
+async def save_document_image_as_png(file_path: str):
     """
     Capture the Photoshop document and save as PNG file
     
@@ -274,53 +516,15 @@ def save_document_image_as_png(file_path: str):
     Returns:
         dict: Status and file info
     """
-    command = createCommand("getDocumentImage", {})
-    response = sendCommand(command)
-    
-    if response.get('format') == 'raw' and 'rawDataBase64' in response:
-        try:
-            # Decode raw data
-            raw_bytes = base64.b64decode(response['rawDataBase64'])
-            
-            # Extract metadata
-            width = response['width']
-            height = response['height']
-            components = response['components']
-            
-            # Convert to numpy array and reshape
-            pixel_array = np.frombuffer(raw_bytes, dtype=np.uint8)
-            image_array = pixel_array.reshape((height, width, components))
-            
-            # Create and save PNG
-            mode = 'RGBA' if components == 4 else 'RGB'
-            image = Image.fromarray(image_array, mode)
-            image.save(file_path, 'PNG')
-            
-            return {
-                'status': 'success',
-                'file_path': file_path,
-                'width': width,
-                'height': height,
-                'size_bytes': os.path.getsize(file_path)
-            }
-            
-        except Exception as e:
-            return {
-                'status': 'error',
-                'error': str(e)
-            }
-    else:
-        return {
-            'status': 'error',
-            'error': 'No raw image data received'
-        }
+    return await save_document_image(file_path, "png")
 
 @mcp.tool()
-def get_layers() -> list:
+async def get_layers(refresh: bool = False) -> list:
     """Returns a nested list of dicts that contain layer info and the order they are arranged in.
 
     Args:
-        None
+        refresh (bool): Whether to always fetch the layers from Photoshop. By default, layers
+            reported by a recent command are returned without contacting Photoshop.
         
     Returns:
         list: A nested list of dictionaries containing layer information and hierarchy.
@@ -329,13 +533,18 @@ def get_layers() -> list:
             Example: [{'name': 'Group 1', 'layers': [{'name': 'Layer 1'}, {'name': 'Layer 2'}]}, {'name': 'Background'}]
     """
 
+    if not refresh:
+        cached = document_cache.get_layers(APPLICATION)
+        if cached:
+            return cached
+
     command = createCommand("getLayers", {})
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def place_image(
+async def place_image(
     layer_id: int,
     image_path: str
 ):
@@ -353,10 +562,10 @@ def place_image(
         "imagePath":image_path
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def rename_layer(
+async def rename_layer(
     layer_id:int,
     new_layer_name:str
 
@@ -375,11 +584,11 @@ def rename_layer(
 
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def scale_layer(
+async def scale_layer(
     layer_id:int,
     width:int,
     height:int,
@@ -404,11 +613,11 @@ def scale_layer(
         "interpolationMethod":interpolation_method
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def rotate_layer(
+async def rotate_layer(
     layer_id:int,
     angle:int,
     anchor_position:str,
@@ -430,11 +639,11 @@ def rotate_layer(
         "interpolationMethod":interpolation_method
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def flip_layer(
+async def flip_layer(
     layer_id:int,
     axis:str
 ):
@@ -450,11 +659,11 @@ def flip_layer(
         "axis":axis
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def delete_layer(
+async def delete_layer(
     layer_id:int
 ):
     """Deletes the layer with the specified ID
@@ -467,12 +676,12 @@ def delete_layer(
         "layerId":layer_id
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 
 @mcp.tool()
-def set_layer_visibility(
+async def set_layer_visibility(
     layer_id:int,
     visible:bool
 ):
@@ -488,11 +697,11 @@ def set_layer_visibility(
         "visible":visible
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def generate_image(
+async def generate_image(
     layer_name:str,
     prompt:str,
     content_type:str = "none"
@@ -511,11 +720,11 @@ def generate_image(
         "contentType":content_type
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def move_layer(
+async def move_layer(
     layer_id:int,
     position:str
 ):
@@ -531,12 +740,16 @@ def move_layer(
         "position":position
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def get_document_info():
+async def get_document_info(refresh: bool = False):
     """Retrieves information about the currently active document.
 
+    Args:
+        refresh (bool): Whether to always fetch the info from Photoshop. By default, info
+            reported by a recent command is returned without contacting Photoshop.
+
     Returns:
         response : An object containing the following document properties:
             - height (int): The height of the document in pixels.
@@ -550,12 +763,17 @@ def get_document_info():
 
     """
 
-    command = createCommand("getDocumentInfo", {})
+    if not refresh:
+        cached = document_cache.get_document_info(APPLICATION)
+        if cached:
+            return cached
+
+    command = createCommand("getDocumentInfo", {}, snapshot="summary")
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def crop_document():
+async def crop_document():
     """Crops the document to the active selection.
 
     This function removes all content outside the selection area and resizes the document 
@@ -566,10 +784,10 @@ def crop_document():
 
     command = createCommand("cropDocument", {})
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def paste_from_clipboard(layer_id: int, paste_in_place: bool = True):
+async def paste_from_clipboard(layer_id: int, paste_in_place: bool = True):
     """Pastes the current clipboard contents onto the specified layer.
 
     If `paste_in_place` is True, the content will be positioned exactly where it was cut or copied from.
@@ -587,10 +805,10 @@ def paste_from_clipboard(layer_id: int, paste_in_place: bool = True):
         "pasteInPlace":paste_in_place
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def rasterize_layer(layer_id: int):
+async def rasterize_layer(layer_id: int):
     """Converts the specified layer into a rasterized (flat) image.
 
     This process removes any vector, text, or smart object properties, turning the layer 
@@ -604,10 +822,10 @@ def rasterize_layer(layer_id: int):
         "layerId":layer_id
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def open_photoshop_file(file_path: str):
+async def open_photoshop_file(file_path: str):
     """Opens the specified Photoshop-compatible file within Photoshop.
 
     This function attempts to open a file in Adobe Photoshop. The file must be in a 
@@ -627,10 +845,10 @@ def open_photoshop_file(file_path: str):
         "filePath":file_path
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def cut_selection_to_clipboard(layer_id: int):
+async def cut_selection_to_clipboard(layer_id: int):
     """Copies and removes (cuts) the selected pixels from the specified layer to the system clipboard.
 
     This function requires an active selection.
@@ -643,11 +861,11 @@ def cut_selection_to_clipboard(layer_id: int):
         "layerId":layer_id
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def copy_merged_selection_to_clipboard():
+async def copy_merged_selection_to_clipboard():
     """Copies the selected pixels from all visible layers to the system clipboard.
 
     This function requires an active selection. If no selection is active, the operation will fail.
@@ -661,12 +879,12 @@ def copy_merged_selection_to_clipboard():
         RuntimeError: If no active selection exists.
     """
 
-    command = createCommand("copyMergedSelectionToClipboard", {})
+    command = createCommand("copyMergedSelectionToClipboard", {}, snapshot="summary")
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def copy_selection_to_clipboard(layer_id: int):
+async def copy_selection_to_clipboard(layer_id: int):
     """Copies the selected pixels from the specified layer to the system clipboard.
 
     This function requires an active selection. If no selection is active, the operation will fail.
@@ -680,12 +898,12 @@ def copy_selection_to_clipboard(layer_id: int):
 
     command = createCommand("copySelectionToClipboard", {
         "layerId":layer_id
-    })
+    }, snapshot="summary")
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def select_subject(layer_id: int):
+async def select_subject(layer_id: int):
     """Automatically selects the subject in the specified layer.
 
     This function identifies and selects the subject in the given image layer. 
@@ -701,10 +919,10 @@ def select_subject(layer_id: int):
         "layerId":layer_id
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def select_sky(layer_id: int):
+async def select_sky(layer_id: int):
     """Automatically selects the sky in the specified layer.
 
     This function identifies and selects the sky in the given image layer. 
@@ -720,17 +938,20 @@ def select_sky(layer_id: int):
         "layerId":layer_id
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def get_layer_bounds(
-    layer_id: int
+async def get_layer_bounds(
+    layer_id: int,
+    refresh: bool = False
 ):
     """Returns the pixel bounds for the layer with the specified ID
     
     Args:
         layer_id (int): ID of the layer to get the bounds information from
+        refresh (bool): Whether to always fetch the bounds from Photoshop. By default, bounds
+            reported by a recent command are returned without contacting Photoshop.
 
     Returns:
         dict: A dictionary containing the layer bounds with the following properties:
@@ -743,14 +964,19 @@ def get_layer_bounds(
         RuntimeError: If the layer doesn't exist or if the operation fails
     """
     
+    if not refresh:
+        cached = document_cache.get_layer_bounds(APPLICATION, layer_id)
+        if cached:
+            return cached
+
     command = createCommand("getLayerBounds", {
         "layerId":layer_id
-    })
+    }, snapshot="summary")
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def remove_background(
+async def remove_background(
     layer_id:int
 ):
     """Automatically removes the background of the image in the layer with the specified ID and keeps the main subject
@@ -763,10 +989,10 @@ def remove_background(
         "layerId":layer_id
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def create_pixel_layer(
+async def create_pixel_layer(
     layer_name:str,
     fill_neutral:bool,
     opacity:int = 100,
@@ -788,10 +1014,163 @@ def create_pixel_layer(
         "blendMode":blend_mode
     })
 
-    return sendCommand(command)
+    return await send_command(command)
+
+async def check_font_name(postscript_font_name):
+    """
+    Returns a warning, listing close matches, if a font is not among the
+    fonts found on this machine, or None. Photoshop can still have fonts
+    that are not found, such as Adobe Fonts and fonts bundled with the app,
+    so the warning doesn't stop the command. The check is skipped if no
+    installed fonts could be found.
+    """
+    if postscript_font_name is None:
+        return None
+
+    font_index = await font_discovery.index()
+    if len(font_index) == 0 or postscript_font_name in font_index:
+        return None
+
+    installed = font_index.match_case(postscript_font_name)
+    if installed:
+        return f"Font {postscript_font_name} was not found, but {installed} was. PostScript names are case sensitive."
+
+    suggestions = font_index.suggest(postscript_font_name)
+    return f"Font {postscript_font_name} was not found among the installed fonts. If Photoshop doesn't have it either, it will substitute another font. Close matches: {', '.join(suggestions)}. Use search_fonts to find the PostScript names of installed fonts."
+
+# Number of fonts suggested when a font can't render some text
+COVERING_FONT_SUGGESTIONS = 5
+
+async def check_text_coverage(postscript_font_name, text):
+    """
+    Returns a warning if a font has no glyphs for some of the characters in
+    text, naming similar fonts that do, or None if the font covers the text
+    or either is unknown.
+    """
+    if postscript_font_name is None or not text:
+        return None
+
+    coverage = await font_discovery.coverage()
+    if postscript_font_name not in coverage:
+        return None
+
+    missing = coverage.missing(postscript_font_name, text)
+    if not missing:
+        return None
+
+    # Prefer fonts with names like the requested one, such as other styles
+    # of the same family
+    font_index = await font_discovery.index()
+    similar = font_index.search(postscript_font_name, font_index.MAX_CANDIDATES)
+    suggestions = coverage.fonts_covering(text, similar)[:COVERING_FONT_SUGGESTIONS]
+    if len(suggestions) < COVERING_FONT_SUGGESTIONS:
+        suggestions += [
+            name for name in coverage.fonts_covering(text)
+            if name not in suggestions
+        ][:COVERING_FONT_SUGGESTIONS - len(suggestions)]
+
+    warning = f"Font {postscript_font_name} has no glyphs for: {missing!r}. These characters will not render correctly."
+    if suggestions:
+        warning += f" Fonts that cover the text: {', '.join(suggestions)}."
+    return warning
+
+def add_warning(response, *warnings):
+    for warning in warnings:
+        if warning and isinstance(response, dict):
+            response.setdefault("warnings", []).append(warning)
+    return response
 
 @mcp.tool()
-def create_multi_line_text_layer(
+async def find_fonts_for_text(text: str, query: str = "", limit: int = 20):
+    """Returns the installed fonts that have glyphs for every character in the text, such as
+    Cyrillic, CJK or Arabic text. Use this to choose a font before creating or editing a text layer.
+
+    Args:
+        text (str): The text the font must be able to display.
+        query (str): Optional font name, such as a family name. Fonts matching it are returned first.
+        limit (int): Maximum number of names to return.
+
+    Returns:
+        list: PostScript font names
+    """
+    coverage = await font_discovery.coverage()
+
+    names = None
+    if query:
+        font_index = await font_discovery.index()
+        names = font_index.search(query, font_index.MAX_CANDIDATES)
+
+    return coverage.fonts_covering(text, names)[:limit]
+
+@mcp.tool()
+async def search_fonts(query: str, limit: int = 20):
+    """Searches the fonts installed on the system and returns the PostScript names that best match
+    the query, best first. Use the names returned with the text layer tools.
+
+    Matching ignores case, spaces and punctuation and tolerates typos, so "helvetica bold" finds
+    "Helvetica-Bold".
+
+    Args:
+        query (str): All or part of a font name, such as a family name. An empty query lists fonts
+            alphabetically.
+        limit (int): Maximum number of names to return.
+
+    Returns:
+        list: PostScript font names
+    """
+    font_index = await font_discovery.index()
+    return font_index.search(query, limit)
+
+@mcp.tool()
+async def measure_text(
+    text: str,
+    font_size: int,
+    postscript_font_name: str,
+    position: dict = {"x": 0, "y": 0},
+    resolution: float = None
+    ):
+    """Predicts the pixel bounds a single line text layer will have, from the metrics in the font file,
+    without contacting Photoshop. Use this to work out where to place text (for example to center or
+    right align it) before creating it with create_single_line_text_layer, instead of creating it and
+    then reading its bounds and moving it.
+
+    Predictions include kerning but not tracking, faux styles or script shaping, so bounds for scripts
+    such as Arabic are approximate.
+
+    Args:
+        text (str): The text to measure. Lines may be separated with \\n.
+        font_size (int): Font size, as passed to the text layer tools.
+        postscript_font_name (str): Postscript Font Name of the font. Find installed fonts with search_fonts.
+        position (dict): Position (dict with x, y values) the text would be placed at. Based on bottom left point of the text.
+        resolution (float): Document resolution in pixels per inch. Defaults to the resolution of the active document.
+
+    Returns:
+        dict: 'bounds', the pixels the text would cover ({"left", "top", "right", "bottom"}, as get_layer_bounds
+            returns them), 'width' and 'height' of the bounds, 'advance', the width of the text including side
+            bearings, 'ascent' and 'descent' of the font's lines, and 'leading', the distance between lines.
+            All in pixels.
+    """
+
+    # Measuring needs the font file, so unlike the text layer tools this
+    # fails for fonts that are not found
+    font_file = await font_discovery.font_file(postscript_font_name)
+    if font_file is None:
+        suggestions = (await font_discovery.index()).suggest(postscript_font_name)
+        raise ValueError(f"Unknown font : {postscript_font_name}. Close matches: {', '.join(suggestions)}. Use search_fonts to find the PostScript names of installed fonts.")
+
+    if resolution is None:
+        document_info = await get_document_info()
+        resolution = document_info["response"]["resolution"]
+
+    def measure():
+        metrics = get_font_metrics(*font_file)
+        return measure_font_text(metrics, text, font_size, resolution, position)
+
+    # Loading a font's metrics reads its file
+    return await asyncio.get_running_loop().run_in_executor(None, measure)
+
+@mcp.tool()
+async def create_multi_line_text_layer(
     layer_name:str, 
     text:str, 
     font_size:int, 
@@ -811,7 +1190,7 @@ def create_multi_line_text_layer(
         layer_name (str): The name of the layer to be created. Can be used to select in other api calls.
         text (str): The text to include on the layer.
         font_size (int): Font size.
-        postscript_font_name (string): Postscript Font Name to display the text in. Valid list available via get_option_info.
+        postscript_font_name (string): Postscript Font Name to display the text in. Find installed fonts with search_fonts, or fonts that can display the text with find_fonts_for_text.
         opacity (int): Opacity for the layer specified in percent.
         blend_mode (str): Blend Mode for the layer. Valid list available via get_option_info
         text_color (dict): Color of the text expressed in Red, Green, Blue values between 0 and 255
@@ -820,6 +1199,9 @@ def create_multi_line_text_layer(
         justification (str): text justification. Valid list available via get_option_info.
     """
 
+    font_warning = await check_font_name(postscript_font_name)
+    coverage_warning = await check_text_coverage(postscript_font_name, text)
+
     command = createCommand("createMultiLineTextLayer", {
         "layerName":layer_name,
         "contents":text,
@@ -833,11 +1215,12 @@ def create_multi_line_text_layer(
         "justification":justification
     })
 
-    return sendCommand(command)
+    response = await send_command(command)
+    return add_warning(response, font_warning, coverage_warning)
 
 
 @mcp.tool()
-def create_single_line_text_layer(
+async def create_single_line_text_layer(
     layer_name:str, 
     text:str, 
     font_size:int, 
@@ -850,18 +1233,23 @@ def create_single_line_text_layer(
 
     """
     Create a new single line text layer with the specified ID within the current Photoshop document.
+
+    Use measure_text to work out the position for the text before creating it.
     
      Args:
         layer_name (str): The name of the layer to be created. Can be used to select in other api calls.
         text (str): The text to include on the layer.
         font_size (int): Font size.
-        postscript_font_name (string): Postscript Font Name to display the text in. Valid list available via get_option_info.
+        postscript_font_name (string): Postscript Font Name to display the text in. Find installed fonts with search_fonts, or fonts that can display the text with find_fonts_for_text.
         opacity (int): Opacity for the layer specified in percent.
         blend_mode (str): Blend Mode for the layer. Valid list available via get_option_info
         text_color (dict): Color of the text expressed in Red, Green, Blue values between 0 and 255
         position (dict): Position (dict with x, y values) where the text will be placed in the layer. Based on bottom left point of the text.
     """
 
+    font_warning = await check_font_name(postscript_font_name)
+    coverage_warning = await check_text_coverage(postscript_font_name, text)
+
     command = createCommand("createSingleLineTextLayer", {
         "layerName":layer_name,
         "contents":text,
@@ -873,10 +1261,11 @@ def create_single_line_text_layer(
         "blendMode":blend_mode
     })
 
-    return sendCommand(command)
+    response = await send_command(command)
+    return add_warning(response, font_warning, coverage_warning)
 
 @mcp.tool()
-def edit_text_layer(
+async def edit_text_layer(
     layer_id:int, 
     text:str = None,
     font_size:int = None,
@@ -891,10 +1280,13 @@ def edit_text_layer(
         layer_id (int): The ID of the existing text layer to edit.
         text (str): The new text content to replace the current text in the layer. If None, text will not be changed.
         font_size (int): Font size. If None, size will not be changed.
-        postscript_font_name (string): Postscript Font Name to display the text in. Valid list available via get_option_info. If None, font will not will not be changed.
+        postscript_font_name (string): Postscript Font Name to display the text in. Find installed fonts with search_fonts, or fonts that can display the text with find_fonts_for_text. If None, font will not will not be changed.
         text_color (dict): Color of the text expressed in Red, Green, Blue values between 0 and 255 in format of {"red":255, "green":255, "blue":255}. If None, color will not be changed
     """
 
+    font_warning = await check_font_name(postscript_font_name)
+    coverage_warning = await check_text_coverage(postscript_font_name, text)
+
     command = createCommand("editTextLayer", {
         "layerId":layer_id,
         "contents":text,
@@ -903,12 +1295,13 @@ def edit_text_layer(
         "textColor":text_color
     })
 
-    return sendCommand(command)
+    response = await send_command(command)
+    return add_warning(response, font_warning, coverage_warning)
 
 
 
 @mcp.tool()
-def translate_layer(
+async def translate_layer(
     layer_id: int,
     x_offset:int = 0,
     y_offset:int = 0
@@ -929,10 +1322,10 @@ def translate_layer(
         "yOffset":y_offset
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def remove_layer_mask(
+async def remove_layer_mask(
     layer_id: int
     ):
 
@@ -946,10 +1339,10 @@ def remove_layer_mask(
         "layerId":layer_id
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def add_layer_mask_from_selection(
+async def add_layer_mask_from_selection(
     layer_id: int
     ):
 
@@ -967,10 +1360,10 @@ def add_layer_mask_from_selection(
         "layerId":layer_id
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def set_layer_properties(
+async def set_layer_properties(
     layer_id: int,
     blend_mode: str = "NORMAL",
     layer_opacity: int = 100,
@@ -996,10 +1389,10 @@ def set_layer_properties(
         "isClippingMask":is_clipping_mask
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def fill_selection(
+async def fill_selection(
     layer_id: int,
     color:dict = {"red":255, "green":0, "blue":0},
     blend_mode:str = "NORMAL",
@@ -1022,12 +1415,12 @@ def fill_selection(
         "opacity":opacity
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 
 @mcp.tool()
-def delete_selection(
+async def delete_selection(
     layer_id: int
     ):
 
@@ -1041,20 +1434,20 @@ def delete_selection(
         "layerId":layer_id
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def invert_selection():
+async def invert_selection():
     
     """Inverts the current selection in the Photoshop document"""
 
     command = createCommand("invertSelection", {})
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def clear_selection():
+async def clear_selection():
     
     """Clears / deselects the current selection"""
 
@@ -1064,10 +1457,10 @@ def clear_selection():
         "bounds":{"top": 0, "left": 0, "bottom": 0, "right": 0}
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def select_rectangle(
+async def select_rectangle(
     layer_id:int,
     feather:int = 0,
     anti_alias:bool = True,
@@ -1090,10 +1483,10 @@ def select_rectangle(
         "bounds":bounds
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def select_polygon(
+async def select_polygon(
     layer_id:int,
     feather:int = 0,
     anti_alias:bool = True,
@@ -1116,10 +1509,10 @@ def select_polygon(
         "points":points
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def select_ellipse(
+async def select_ellipse(
     layer_id:int,
     feather:int = 0,
     anti_alias:bool = True,
@@ -1142,10 +1535,10 @@ def select_ellipse(
         "bounds":bounds
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def align_content(
+async def align_content(
     layer_id: int,
     alignment_mode:str
     ):
@@ -1163,10 +1556,10 @@ def align_content(
         "alignmentMode":alignment_mode
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def add_drop_shadow_layer_style(
+async def add_drop_shadow_layer_style(
     layer_id: int,
     blend_mode:str = "MULTIPLY",
     color:dict = {"red":0, "green":0, "blue":0},
@@ -1200,10 +1593,10 @@ def add_drop_shadow_layer_style(
         "size":size
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def duplicate_layer(layer_to_duplicate_id:int, duplicate_layer_name:str):
+async def duplicate_layer(layer_to_duplicate_id:int, duplicate_layer_name:str):
     """
     Duplicates the layer specified by layer_to_duplicate_id ID, creating a new layer above it with the name specified by duplicate_layer_name
 
@@ -1217,10 +1610,10 @@ def duplicate_layer(layer_to_duplicate_id:int, duplicate_layer_name:str):
         "duplicateLayerName":duplicate_layer_name,
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def flatten_all_layers(layer_name:str):
+async def flatten_all_layers(layer_name:str):
     """
     Flatten all layers in the document into a single layer with specified name
 
@@ -1232,10 +1625,10 @@ def flatten_all_layers(layer_name:str):
         "layerName":layer_name,
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def add_color_balance_adjustment_layer(
+async def add_color_balance_adjustment_layer(
     layer_id: int,
     highlights:list = [0,0,0],
     midtones:list = [0,0,0],
@@ -1263,10 +1656,10 @@ def add_color_balance_adjustment_layer(
         "shadows":shadows
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def add_brightness_contrast_adjustment_layer(
+async def add_brightness_contrast_adjustment_layer(
     layer_id: int,
     brightness:int = 0,
     contrast:int = 0):
@@ -1284,11 +1677,11 @@ def add_brightness_contrast_adjustment_layer(
         "contrast":contrast
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def add_stroke_layer_style(
+async def add_stroke_layer_style(
     layer_id: int,
     size: int = 2,
     color: dict = {"red": 0, "green": 0, "blue": 0},
@@ -1317,11 +1710,11 @@ def add_stroke_layer_style(
         "blendMode":blend_mode
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def add_vibrance_adjustment_layer(
+async def add_vibrance_adjustment_layer(
     layer_id: int,
     vibrance:int = 0,
     saturation:int = 0):
@@ -1340,10 +1733,10 @@ def add_vibrance_adjustment_layer(
         "vibrance":vibrance
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def add_black_and_white_adjustment_layer(
+async def add_black_and_white_adjustment_layer(
     layer_id: int,
     colors: dict = {"blue": 20, "cyan": 60, "green": 40, "magenta": 80, "red": 40, "yellow": 60},
     tint: bool = False,
@@ -1371,10 +1764,10 @@ def add_black_and_white_adjustment_layer(
         "tintColor":tint_color
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def apply_gaussian_blur(layer_id: int, radius: float = 2.5):
+async def apply_gaussian_blur(layer_id: int, radius: float = 2.5):
     """Applies a Gaussian Blur to the layer with the specified ID
     
     Args:
@@ -1396,13 +1789,13 @@ def apply_gaussian_blur(layer_id: int, radius: float = 2.5):
         "radius":radius,
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 
 
 @mcp.tool()
-def apply_motion_blur(layer_id: int, angle: int = 0, distance: float = 30):
+async def apply_motion_blur(layer_id: int, angle: int = 0, distance: float = 30):
     """Applies a Motion Blur to the layer with the specified ID
 
     Args:
@@ -1425,11 +1818,25 @@ def apply_motion_blur(layer_id: int, angle: int = 0, distance: float = 30):
         "distance":distance
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
+@mcp.tool()
+async def get_font_status():
+    """Returns whether the list of fonts installed on the system has been read yet. Fonts are read
+    in the background when the server starts. Calls that need them wait until they are ready.
+
+    Returns:
+        dict: 'ready', and 'count', the number of fonts found, once ready
+    """
+    if not font_discovery.ready:
+        return {"ready": False, "count": None}
+
+    font_names = await font_discovery.names()
+    return {"ready": True, "count": len(font_names)}
+
 @mcp.resource("config://get_instructions")
-def get_instructions() -> str:
+async def get_instructions() -> str:
     """Read this first! Returns information and instructions on how to use Photoshop and this API"""
 
     return f"""
@@ -1482,11 +1889,10 @@ def get_instructions() -> str:
 
     interpolation_methods: {", ".join(interpolation_methods)}
 
-    fonts: {", ".join(font_names[:FONT_LIMIT])}
+    fonts: use search_fonts to find the PostScript names of installed fonts, and find_fonts_for_text to find fonts that can display non-Latin text
+    text placement: use measure_text to compute the bounds of a line of text before creating it, rather than creating it and moving it
     """
 
-font_names = list_all_fonts_postscript()
-
 interpolation_methods = [
    "AUTOMATIC",
    "BICUBIC",
@@ -1557,3 +1963,13 @@ blend_modes = [
     "SUBTRACT",
     "VIVIDLIGHT"
 ]
+
+
+def run():
+    """Starts finding fonts and serves MCP on stdio."""
+    # Fonts are found in the background so that the server can answer
+    # requests while they are read. Anything that needs them awaits
+    # font_discovery.names(). This isn't done on import, since process pool
+    # workers import this module again where processes are spawned.
+    font_discovery.start()
+    mcp.run()
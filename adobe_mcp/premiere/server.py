@@ -21,7 +21,8 @@
 # SOFTWARE.
 
 from mcp.server.fastmcp import FastMCP
-from ..shared import init, sendCommand, createCommand, socket_client
+from ..shared import init, send_command, createCommand, socket_client
+from ..shared import document_cache
 import sys
 
 
@@ -49,29 +50,55 @@ socket_client.configure(
 init(APPLICATION, socket_client)
 
 @mcp.tool()
-def get_project_info():
+async def get_project_info():
     """
     Returns info on the currently active project in Premiere Pro.
     """
 
     command = createCommand("getProjectInfo", {
+    }, snapshot="summary")
+
+    return await send_command(command)
+
+@mcp.tool()
+async def get_sequences(refresh: bool = False):
+    """
+    Returns info on all of the sequences in the active project, including their tracks and clips.
+
+    Args:
+        refresh (bool): Whether to always fetch the sequences from Premiere Pro. By default,
+            sequences reported by a recent command are returned without contacting Premiere Pro.
+
+    Returns:
+        list: A list of dicts, one per sequence, with 'id', 'name', 'isActive', 'frameSize',
+            'videoTracks' and 'audioTracks' keys.
+    """
+
+    if not refresh:
+        cached = document_cache.get_sequences(APPLICATION)
+        if cached:
+            return cached
+
+    command = createCommand("getSequences", {
     })
 
-    return sendCommand(command)
+    response = await send_command(command)
+    response["response"] = response.get("sequences")
+    return response
 
 @mcp.tool()
-def save_project():
+async def save_project():
     """
     Saves the active project in Premiere Pro.
     """
 
     command = createCommand("saveProject", {
-    })
+    }, snapshot="none")
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def save_project_as(file_path: str):
+async def save_project_as(file_path: str):
     """Saves the current Premiere project to the specified location.
     
     Args:
@@ -82,12 +109,12 @@ def save_project_as(file_path: str):
     
     command = createCommand("saveProjectAs", {
         "filePath":file_path
-    })
+    }, snapshot="none")
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def open_project(file_path: str):
+async def open_project(file_path: str):
     """Opens the Premiere project at the specified path.
     
     Args:
@@ -100,11 +127,11 @@ def open_project(file_path: str):
         "filePath":file_path
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def create_project(directory_path: str, project_name: str):
+async def create_project(directory_path: str, project_name: str):
     """
     Create a new Premiere project.
 
@@ -122,12 +149,12 @@ def create_project(directory_path: str, project_name: str):
         "name":project_name
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 
 @mcp.tool()
-def set_audio_track_mute(sequence_id:str, audio_track_index: int, mute: bool):
+async def set_audio_track_mute(sequence_id:str, audio_track_index: int, mute: bool):
     """
     Sets the mute property on the specified audio track. If mute is true, all clips on the track will be muted and not played.
 
@@ -146,11 +173,11 @@ def set_audio_track_mute(sequence_id:str, audio_track_index: int, mute: bool):
         "mute":mute
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def set_active_sequence(sequence_id: str):
+async def set_active_sequence(sequence_id: str):
     """
     Sets the sequence with the specified id as the active sequence within Premiere Pro (currently selected and visible in timeline)
     
@@ -162,11 +189,11 @@ def set_active_sequence(sequence_id: str):
         "sequenceId":sequence_id
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def create_sequence_from_media(item_names: list[str], sequence_name: str = "default"):
+async def create_sequence_from_media(item_names: list[str], sequence_name: str = "default"):
     """
     Creates a new sequence from the specified project items, placing clips on the timeline in the order they are provided.
     
@@ -183,10 +210,10 @@ def create_sequence_from_media(item_names: list[str], sequence_name: str = "defa
         "sequenceName":sequence_name
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def add_media_to_sequence(sequence_id:str, item_name: str, video_track_index: int, audio_track_index: int, insertion_time_ticks: int = 0, overwrite: bool = True):
+async def add_media_to_sequence(sequence_id:str, item_name: str, video_track_index: int, audio_track_index: int, insertion_time_ticks: int = 0, overwrite: bool = True):
     """
     Adds a specified media item to the active sequence's timeline.
 
@@ -209,11 +236,11 @@ def add_media_to_sequence(sequence_id:str, item_name: str, video_track_index: in
         "overwrite":overwrite
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def set_audio_clip_disabled(sequence_id:str, audio_track_index: int, track_item_index: int, disabled: bool):
+async def set_audio_clip_disabled(sequence_id:str, audio_track_index: int, track_item_index: int, disabled: bool):
     """
     Enables or disables a audio clip in the timeline.
     
@@ -233,10 +260,10 @@ def set_audio_clip_disabled(sequence_id:str, audio_track_index: int, track_item_
         "disabled":disabled
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def set_video_clip_disabled(sequence_id:str, video_track_index: int, track_item_index: int, disabled: bool):
+async def set_video_clip_disabled(sequence_id:str, video_track_index: int, track_item_index: int, disabled: bool):
     """
     Enables or disables a video clip in the timeline.
     
@@ -256,11 +283,11 @@ def set_video_clip_disabled(sequence_id:str, video_track_index: int, track_item_
         "disabled":disabled
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def add_black_and_white_effect(sequence_id:str, video_track_index: int, track_item_index: int):
+async def add_black_and_white_effect(sequence_id:str, video_track_index: int, track_item_index: int):
     """
     Adds a black and white effect to a clip at the specified track and position.
     
@@ -281,10 +308,10 @@ def add_black_and_white_effect(sequence_id:str, video_track_index: int, track_it
         ]
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def export_frame(sequence_id:str, file_path: str, seconds: int):
+async def export_frame(sequence_id:str, file_path: str, seconds: int):
     """Captures a specific frame from the sequence at the given timestamp
     and exports it as a PNG image file to the specified path.
     
@@ -306,11 +333,11 @@ def export_frame(sequence_id:str, file_path: str, seconds: int):
         }
     )
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def add_gaussian_blur_effect(sequence_id: str, video_track_index: int, track_item_index: int, blurriness: float, blur_dimensions: str = "HORIZONTAL_VERTICAL"):
+async def add_gaussian_blur_effect(sequence_id: str, video_track_index: int, track_item_index: int, blurriness: float, blur_dimensions: str = "HORIZONTAL_VERTICAL"):
     """
     Adds a gaussian blur effect to a clip at the specified track and position.
 
@@ -348,7 +375,7 @@ def add_gaussian_blur_effect(sequence_id: str, video_track_index: int, track_ite
         ]
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 def rgb_to_premiere_color3(rgb_color, alpha=1.0):
     """Converts RGB (0–255) dict to Premiere Pro color format [r, g, b, a] with floats (0.0–1.0)."""
@@ -382,7 +409,7 @@ def rgb_to_premiere_color(rgb_color, alpha=255):
 
 
 @mcp.tool()
-def add_tint_effect(sequence_id: str, video_track_index: int, track_item_index: int, black_map:dict = {"red":0, "green":0, "blue":0}, white_map:dict = {"red":255, "green":255, "blue":255}, amount:int = 100):
+async def add_tint_effect(sequence_id: str, video_track_index: int, track_item_index: int, black_map:dict = {"red":0, "green":0, "blue":0}, white_map:dict = {"red":255, "green":255, "blue":255}, amount:int = 100):
     """
     Adds the tint effect to a clip at the specified track and position.
     
@@ -419,12 +446,12 @@ def add_tint_effect(sequence_id: str, video_track_index: int, track_item_index:
         ]
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 
 @mcp.tool()
-def add_motion_blur_effect(sequence_id: str, video_track_index: int, track_item_index: int, direction: int, length: int):
+async def add_motion_blur_effect(sequence_id: str, video_track_index: int, track_item_index: int, direction: int, length: int):
     """
     Adds the directional blur effect to a clip at the specified track and position.
     
@@ -458,10 +485,10 @@ def add_motion_blur_effect(sequence_id: str, video_track_index: int, track_item_
         ]
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def append_video_transition(sequence_id: str, video_track_index: int, track_item_index: int, transition_name: str, duration: int = 1.0, clip_alignment: float = 0.5):
+async def append_video_transition(sequence_id: str, video_track_index: int, track_item_index: int, transition_name: str, duration: int = 1.0, clip_alignment: float = 0.5):
     """
     Creates a transition between the specified clip and the adjacent clip on the timeline.
     
@@ -518,11 +545,11 @@ def append_video_transition(sequence_id: str, video_track_index: int, track_item
         "duration":duration
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 
 @mcp.tool()
-def set_video_clip_properties(sequence_id: str, video_track_index: int, track_item_index: int, opacity: int = 100, blend_mode: str = "NORMAL"):
+async def set_video_clip_properties(sequence_id: str, video_track_index: int, track_item_index: int, opacity: int = 100, blend_mode: str = "NORMAL"):
     """
     Sets opacity and blend mode properties for a video clip in the timeline.
 
@@ -552,10 +579,10 @@ def set_video_clip_properties(sequence_id: str, video_track_index: int, track_it
         "blendMode":blend_mode
     })
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.tool()
-def import_media(file_paths:list):
+async def import_media(file_paths:list):
     """
     Imports a list of media files into the active Premiere project.
 
@@ -566,9 +593,9 @@ def import_media(file_paths:list):
 
     command = createCommand("importMedia", {
         "filePaths":file_paths
-    })
+    }, snapshot="summary")
 
-    return sendCommand(command)
+    return await send_command(command)
 
 @mcp.resource("config://get_instructions")
 def get_instructions() -> str:
@@ -1,18 +1,26 @@
 """Shared utilities for Adobe MCP servers."""
 
-from .core import init, sendCommand, createCommand
-from .socket_client import configure, connect, disconnect, send_command
+from .core import init, sendCommand, send_command, createCommand, createBatch
+from .socket_client import configure, connect, disconnect
 from .logger import log
-from .fonts import list_all_fonts_postscript
+from .document_state import DocumentStateCache, document_cache
+from .fonts import list_all_fonts_postscript, FontDiscovery, FontIndex, FontCoverage, font_discovery
 
 __all__ = [
     "init",
     "sendCommand", 
     "createCommand",
+    "createBatch",
     "configure",
     "connect",
     "disconnect",
     "send_command",
     "log",
-    "list_all_fonts_postscript"
+    "DocumentStateCache",
+    "document_cache",
+    "list_all_fonts_postscript",
+    "FontDiscovery",
+    "FontIndex",
+    "FontCoverage",
+    "font_discovery"
 ]
\ No newline at end of file
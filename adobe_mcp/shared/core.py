@@ -1,26 +1,104 @@
-import logger
+import contextvars
+import uuid
+from . import logger
+from .document_state import document_cache
 
 application = None
 socket_client = None
 
+# Application that commands are created for, when one process serves the
+# tools of several applications. Defaults to the application passed to init().
+current_application = contextvars.ContextVar("current_application", default=None)
+
 def init(app, socket):
     global application, socket_client
     application = app
     socket_client = socket
 
 
-def createCommand(action:str, options:dict) -> str:
+# How much application state the plugin sends back with a response
+SNAPSHOT_NONE = "none"          # only the command's own response
+SNAPSHOT_SUMMARY = "summary"    # plus document / project info
+SNAPSHOT_FULL = "full"          # plus layers / sequences
+
+SNAPSHOT_MODES = (SNAPSHOT_NONE, SNAPSHOT_SUMMARY, SNAPSHOT_FULL)
+
+def createCommand(action:str, options:dict, snapshot:str = SNAPSHOT_FULL) -> str:
+    """
+    Creates a command to send to the application plugin.
+
+    Args:
+        action (str): Name of the plugin command handler
+        options (dict): Options passed to the handler
+        snapshot (str): How much application state to send back with the
+            response. One of "none", "summary" or "full".
+    """
+    if snapshot not in SNAPSHOT_MODES:
+        raise ValueError(f"Invalid snapshot mode : {snapshot}. Valid values are: {', '.join(SNAPSHOT_MODES)}")
+
     command = {
-        "application":application,
+        "application":current_application.get() or application,
         "action":action,
-        "options":options
+        "options":options,
+        "snapshot":snapshot,
+        "requestId":uuid.uuid4().hex
     }
 
     return command
 
-def sendCommand(command:dict):
+def createBatch(commands:list, stop_on_error:bool = True, snapshot:str = SNAPSHOT_FULL) -> dict:
+    """
+    Creates a single command that runs an ordered list of commands in one
+    round-trip.
+
+    Args:
+        commands (list): Commands to run, either as returned by createCommand
+            or as dicts with "action" and "options" keys.
+        stop_on_error (bool): Whether to skip the remaining commands after one
+            fails.
+        snapshot (str): How much application state to send back once the
+            whole batch has run.
+    """
+    steps = []
+    for i, c in enumerate(commands):
+        if not isinstance(c, dict) or not isinstance(c.get("action"), str):
+            raise ValueError(f"Invalid batch command at index {i} : {c!r}. Each command must be a dict with an \"action\" key")
+        steps.append({"action":c["action"], "options":c.get("options", {})})
+
+    return createCommand("runBatch", {
+        "commands":steps,
+        "stopOnError":stop_on_error
+    }, snapshot)
 
-    response = socket_client.send_message_blocking(command)
+async def send_command(command:dict, on_chunk=None):
+    """
+    Sends a command to the application and waits for the response.
+
+    Args:
+        command (dict): Command returned by createCommand
+        on_chunk (callable): Called with each chunk of a streamed response,
+            before the response itself arrives
+    """
+
+    # Lets the plugin reply with only the layers that changed since the
+    # snapshot we already have
+    revision = document_cache.known_revision(command["application"])
+    if revision and command.get("snapshot", SNAPSHOT_FULL) == SNAPSHOT_FULL:
+        command["snapshotRevision"] = revision
+
+    document_cache.command_sent(command["application"], command)
+    try:
+        response = await socket_client.send_command(command, on_chunk=on_chunk)
+    except BaseException:
+        document_cache.command_finished(command["application"], command)
+        raise
+
+    document_cache.command_finished(command["application"], command, response)
     
     logger.log(f"Final response: {response['status']}")
-    return response
\ No newline at end of file
+    return response
+
+def sendCommand(command:dict):
+    """Blocking version of send_command, for scripts."""
+
+    return socket_client.run_blocking(send_command(command))
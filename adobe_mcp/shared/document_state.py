@@ -0,0 +1,383 @@
+"""Local copies of application document state, kept current from command responses."""
+
+import threading
+import time
+
+
+def flatten_layers(layers, parent_id=None, out=None):
+    """
+    Flattens a nested layer tree into a dict of layers by id.
+
+    Each layer records the id of its parent group and its position within it,
+    which is how the plugin describes layers in a delta.
+
+    Args:
+        layers (list): Nested list of layer dicts, as returned by getLayers
+        parent_id (int): ID of the group containing layers, None at the top level
+
+    Returns:
+        dict: Layer dicts, without their 'layers' key, keyed by layer id
+    """
+    if out is None:
+        out = {}
+
+    for index, layer in enumerate(layers):
+        info = {k: v for k, v in layer.items() if k != "layers"}
+        info["parentId"] = parent_id
+        info["index"] = index
+        out[info["id"]] = info
+
+        if layer.get("layers"):
+            flatten_layers(layer["layers"], info["id"], out)
+
+    return out
+
+
+def build_layer_tree(layers_by_id):
+    """
+    Rebuilds the nested layer tree from a dict of flattened layers.
+
+    Args:
+        layers_by_id (dict): Layer dicts keyed by id, as returned by flatten_layers
+
+    Returns:
+        list: Nested list of layer dicts in the same shape getLayers returns
+    """
+    children = {}
+    for layer in layers_by_id.values():
+        children.setdefault(layer.get("parentId"), []).append(layer)
+
+    def build(parent_id):
+        out = []
+        for layer in sorted(children.get(parent_id, []), key=lambda l: l.get("index", 0)):
+            info = {k: v for k, v in layer.items() if k not in ("parentId", "index")}
+            sublayers = build(layer["id"])
+            if sublayers:
+                info["layers"] = sublayers
+            out.append(info)
+        return out
+
+    return build(None)
+
+
+# Actions that only read state. Any other action is assumed to change the
+# document, so cached state is not used while it is in flight.
+READ_ONLY_ACTIONS = {
+    "getDocuments",
+    "getDocumentInfo",
+    "getDocumentImage",
+    "getDocumentRegion",
+    "getLayerPixels",
+    "getLayers",
+    "getLayerBounds",
+    "getProjectInfo",
+    "getSequences",
+    "copySelectionToClipboard",
+    "copyMergedSelectionToClipboard",
+}
+
+# Cached state older than this is not served, since the document may have
+# been edited by hand in the application
+CACHE_MAX_AGE = 30
+
+
+class DocumentStateCache:
+    """
+    Keeps the latest state each application has reported for its documents,
+    and serves read-only lookups from it without a round-trip.
+
+    Every successful Photoshop response carries the active document's info,
+    its layers and whether there is an active selection. Layers come either as
+    the full tree or, when the revision sent with the command was current, as
+    only the layers added, changed or removed since then. Deltas are merged
+    into the local copy so callers always see the full tree.
+
+    Premiere responses carry the active project's sequences in the same way,
+    with the project id in place of the document id. Sequence deltas usually
+    only cover the sequences the command touched.
+
+    Cached state for an application is only served while it is fresh:
+
+    - no command that may change a document is in flight for the application
+    - the last such command did not fail (a failure may have left partial
+      changes the cache knows nothing about)
+    - it was reported less than max_age seconds ago
+    """
+
+    def __init__(self, max_age=CACHE_MAX_AGE):
+        self.max_age = max_age
+
+        # (application, document id) -> {"epoch", "revision", "layers" or
+        # "sequences", "document", "documentInfo", "hasActiveSelection", "updated"}
+        self._documents = {}
+
+        # application -> document id of the most recent response
+        self._current = {}
+
+        # application -> number of commands in flight that may change state
+        self._pending_changes = {}
+
+        # Responses may be applied from the event loop and from blocking callers
+        self._lock = threading.Lock()
+
+    def known_revision(self, application):
+        """
+        Returns the snapshotRevision to send with the next command, so the
+        plugin can reply with a delta, or None if nothing is cached.
+        """
+        with self._lock:
+            document_id = self._current.get(application)
+            state = self._documents.get((application, document_id))
+
+            if state is None:
+                return None
+
+            return {
+                "documentId": document_id,
+                "epoch": state["epoch"],
+                "revision": state["revision"],
+            }
+
+    def command_sent(self, application, command):
+        """Records that a command is about to be sent to the application."""
+        if command["action"] in READ_ONLY_ACTIONS:
+            return
+
+        with self._lock:
+            self._pending_changes[application] = self._pending_changes.get(application, 0) + 1
+
+    def command_finished(self, application, command, response=None):
+        """
+        Records that a command has completed, updating the cache from its
+        response. Pass response=None if the command failed.
+
+        Returns:
+            dict: The response, with 'layers' holding the full tree when known
+        """
+        if command["action"] not in READ_ONLY_ACTIONS:
+            with self._lock:
+                self._pending_changes[application] = max(0, self._pending_changes.get(application, 0) - 1)
+
+                if response is None:
+                    self._invalidate(application)
+
+        if response is None:
+            return None
+
+        if command["action"] not in READ_ONLY_ACTIONS and "snapshotRevision" not in response:
+            # Sent with a reduced snapshot, so the cache did not see what the
+            # command changed. The next full snapshot refreshes it.
+            self.invalidate(application)
+
+        return self.apply(application, response)
+
+    def apply(self, application, response):
+        """
+        Updates the cache from a command response.
+
+        A 'layersDelta' in the response is merged into the cached tree and
+        replaced by the full 'layers' tree, and a 'sequencesDelta' by the full
+        'sequences' list.
+
+        Args:
+            application (str): Application the response came from
+            response (dict): The response packet
+
+        Returns:
+            dict: The response, with 'layers' holding the full tree when known
+        """
+        revision = response.get("snapshotRevision")
+        if not revision:
+            document = response.get("document")
+            if document and "id" in document:
+                # A summary snapshot still says which document is active, so
+                # the next full snapshot can be a delta against its cached state
+                with self._lock:
+                    self._current[application] = document["id"]
+            return response
+
+        document_id = revision["documentId"]
+        key = (application, document_id)
+
+        with self._lock:
+            self._current[application] = document_id
+
+            if "layers" in response or "sequences" in response:
+                state = {
+                    "epoch": revision["epoch"],
+                    "revision": revision["revision"],
+                }
+                if "layers" in response:
+                    state["layers"] = flatten_layers(response["layers"])
+                else:
+                    state["sequences"] = {s["id"]: s for s in response["sequences"]}
+                self._documents[key] = state
+                self._update(state, response)
+                return response
+
+            delta = response.pop("layersDelta", None) or response.pop("sequencesDelta", None)
+            if delta is None:
+                return response
+
+            state = self._documents.get(key)
+
+            if state is None or state["epoch"] != revision["epoch"]:
+                # Nothing to merge into. The next command will not send a
+                # revision, so the plugin replies with the full tree.
+                self._documents.pop(key, None)
+                return response
+
+            if state["revision"] == delta["baseRevision"]:
+                if "layers" in state:
+                    layers = state["layers"]
+                    for layer_id in delta["removed"]:
+                        layers.pop(layer_id, None)
+                    for layer in delta["added"] + delta["changed"]:
+                        layers[layer["id"]] = layer
+                else:
+                    self._merge_sequences(state, delta)
+                state["revision"] = revision["revision"]
+
+                # A delta that only checked the sequences a command touched
+                # says nothing about hand edits to the others, so it does not
+                # make the cached state any fresher
+                self._update(state, response, refreshed=delta.get("complete", True))
+            elif state["revision"] < delta["baseRevision"]:
+                # A response was missed, so the cached tree can't be trusted
+                self._documents.pop(key, None)
+                return response
+
+            # Otherwise this response was overtaken by a newer one that has
+            # already been applied, and the cached tree is the latest
+            if "layers" in state:
+                response["layers"] = build_layer_tree(state["layers"])
+            else:
+                response["sequences"] = self._sequence_list(state)
+            return response
+
+    def _merge_sequences(self, state, delta):
+        sequences = state["sequences"]
+        for sequence_id in delta["removed"]:
+            sequences.pop(sequence_id, None)
+        for sequence in delta["changed"]:
+            sequences[sequence["id"]] = sequence
+
+        # Keep the plugin's order, and mark the active sequence
+        state["sequences"] = {
+            sequence_id: dict(sequences[sequence_id], isActive=sequence_id == delta["activeSequenceId"])
+            for sequence_id in delta["order"]
+            if sequence_id in sequences
+        }
+
+    def _sequence_list(self, state):
+        return [dict(s) for s in state["sequences"].values()]
+
+    def _update(self, state, response, refreshed=True):
+        for k in ("document", "documentInfo", "hasActiveSelection"):
+            if k in response:
+                state[k] = response[k]
+        if refreshed:
+            state["updated"] = time.monotonic()
+
+    def _invalidate(self, application):
+        for (app, _), state in self._documents.items():
+            if app == application:
+                state["updated"] = None
+
+    def invalidate(self, application):
+        """Stops cached state for the application being served until it is next refreshed."""
+        with self._lock:
+            self._invalidate(application)
+
+    def _fresh_state(self, application):
+        if self._pending_changes.get(application, 0) > 0:
+            return None
+
+        state = self._documents.get((application, self._current.get(application)))
+        if state is None or state.get("updated") is None:
+            return None
+
+        if time.monotonic() - state["updated"] >= self.max_age:
+            return None
+
+        return state
+
+    def _cached_response(self, state, response):
+        return {
+            "status": "SUCCESS",
+            "response": response,
+            "document": state.get("document"),
+            "hasActiveSelection": state.get("hasActiveSelection"),
+            "cached": True,
+        }
+
+    def get_layers(self, application):
+        """
+        Returns a getLayers style response for the active document from the
+        cache, or None if the cached state is not fresh.
+        """
+        with self._lock:
+            state = self._fresh_state(application)
+            if state is None:
+                return None
+
+            if "layers" not in state:
+                return None
+
+            return self._cached_response(state, build_layer_tree(state["layers"]))
+
+    def get_sequences(self, application):
+        """
+        Returns a getSequences style response for the active project from the
+        cache, or None if the cached state is not fresh.
+        """
+        with self._lock:
+            state = self._fresh_state(application)
+            if state is None or "sequences" not in state:
+                return None
+
+            sequences = self._sequence_list(state)
+            return {
+                "status": "SUCCESS",
+                "response": sequences,
+                "sequences": sequences,
+                "cached": True,
+            }
+
+    def get_document_info(self, application):
+        """
+        Returns a getDocumentInfo style response for the active document from
+        the cache, or None if the cached state is not fresh.
+        """
+        with self._lock:
+            state = self._fresh_state(application)
+            if state is None or "documentInfo" not in state:
+                return None
+
+            return self._cached_response(state, dict(state["documentInfo"]))
+
+    def get_layer_bounds(self, application, layer_id):
+        """
+        Returns a getLayerBounds style response for a layer in the active
+        document from the cache, or None if the cached state is not fresh or
+        does not include the layer's bounds.
+        """
+        with self._lock:
+            state = self._fresh_state(application)
+            if state is None:
+                return None
+
+            layer = state.get("layers", {}).get(layer_id)
+            if layer is None or "bounds" not in layer:
+                return None
+
+            return self._cached_response(state, dict(layer["bounds"]))
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+            self._current.clear()
+            self._pending_changes.clear()
+
+
+document_cache = DocumentStateCache()
@@ -23,25 +23,49 @@
 import os
 import sys
 import glob
-from fontTools.ttLib import TTFont
+import json
+import re
+import asyncio
+import bisect
+import difflib
+import tempfile
+import threading
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
 
-def list_all_fonts_postscript():
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+ttLib = lazy_import("fontTools.ttLib")
+
+# Bump when the cached data changes shape, so old caches are ignored
+FONT_CACHE_VERSION = 3
+
+def font_cache_path():
     """
-    Returns a list of PostScript names for all fonts installed on the system.
-    Works on both Windows and macOS.
-    
-    Returns:
-        list: A list of PostScript font names as strings
+    Returns the path of the font cache file, in the user's cache directory.
     """
-    postscript_names = []
-    
-    # Get font directories based on platform
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~/AppData/Local')
+        cache_dir = os.path.join(base, 'adobe-mcp', 'Cache')
+    elif sys.platform == 'darwin':
+        cache_dir = os.path.expanduser('~/Library/Caches/adobe-mcp')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+        cache_dir = os.path.join(base, 'adobe-mcp')
+
+    return os.path.join(cache_dir, 'fonts.json')
+
+def _font_dirs():
     font_dirs = []
     
     if sys.platform == 'win32':  # Windows
         # Windows font directory
         if 'WINDIR' in os.environ:
             font_dirs.append(os.path.join(os.environ['WINDIR'], 'Fonts'))
+        # Fonts installed for the current user only
+        if 'LOCALAPPDATA' in os.environ:
+            font_dirs.append(os.path.join(os.environ['LOCALAPPDATA'], 'Microsoft', 'Windows', 'Fonts'))
     
     elif sys.platform == 'darwin':  # macOS
         # macOS system font directories
@@ -52,57 +76,602 @@ def list_all_fonts_postscript():
         ])
     
     else:
-        print(f"Unsupported platform: {sys.platform}")
-        return []
-    
+        print(f"Unsupported platform: {sys.platform}", file=sys.stderr)
+        return None
+
+    return font_dirs
+
+def list_font_files(font_dirs=None):
+    """
+    Returns the paths of all font files in the font directories.
+
+    Args:
+        font_dirs (list): Directories to search. Defaults to the system font
+            directories.
+
+    Returns:
+        list: Paths of .ttf, .ttc and .otf files, or None on unsupported platforms
+    """
+    recursive = font_dirs is not None or sys.platform == 'darwin'
+
+    if font_dirs is None:
+        font_dirs = _font_dirs()
+        if font_dirs is None:
+            return None
+
     # Get all font files from all directories
     font_extensions = ['*.ttf', '*.ttc', '*.otf']
-    font_files = []
+    font_files = set()
     
     for font_dir in font_dirs:
         if os.path.exists(font_dir):
             for ext in font_extensions:
-                font_files.extend(glob.glob(os.path.join(font_dir, ext)))
+                font_files.update(glob.glob(os.path.join(font_dir, ext)))
                 # Also check subdirectories on macOS
-                if sys.platform == 'darwin':
-                    font_files.extend(glob.glob(os.path.join(font_dir, '**', ext), recursive=True))
-    
-    # Process each font file
-    for font_path in font_files:
+                if recursive:
+                    font_files.update(glob.glob(os.path.join(font_dir, '**', ext), recursive=True))
+
+    return sorted(font_files)
+
+def cmap_ranges(font):
+    """
+    Returns the Unicode codepoints a font maps to glyphs, as a compact list
+    of ranges.
+
+    Args:
+        font: A TTFont object
+
+    Returns:
+        list: Flat list of inclusive [first, last, first, last, ...] codepoint
+            ranges, in order
+    """
+    try:
+        cmap = font.getBestCmap()
+    except Exception:
+        cmap = None
+
+    ranges = []
+    for codepoint in sorted(cmap or ()):
+        if ranges and ranges[-1] == codepoint - 1:
+            ranges[-1] = codepoint
+        else:
+            ranges.extend((codepoint, codepoint))
+
+    return ranges
+
+def read_font_faces(font_path):
+    """
+    Returns the PostScript name and character coverage of the fonts in a
+    font file.
+
+    Fonts are opened lazily, so only the table directory and the tables
+    holding the name and character map are read, and each font in a .ttc
+    collection is read from the one open file.
+
+    Args:
+        font_path (str): Path to a .ttf, .otf or .ttc file
+
+    Returns:
+        list: {"name", "number", "coverage"} for each font in the file that
+            has a PostScript name, with its number within a .ttc collection
+            (-1 for other files) and coverage as returned by cmap_ranges
+    """
+    faces = []
+
+    # TrueType Collections (.ttc files) can contain multiple fonts
+    if font_path.lower().endswith('.ttc'):
         try:
-            # TrueType Collections (.ttc files) can contain multiple fonts
-            if font_path.lower().endswith('.ttc'):
-                try:
-                    ttc = TTFont(font_path, fontNumber=0)
-                    num_fonts = ttc.reader.numFonts
-                    ttc.close()
-                    
-                    # Extract PostScript name from each font in the collection
-                    for i in range(num_fonts):
-                        try:
-                            font = TTFont(font_path, fontNumber=i)
-                            ps_name = _extract_postscript_name(font)
-                            if ps_name and not ps_name.startswith('.'):
-                                postscript_names.append(ps_name)
-                            font.close()
-                        except Exception as e:
-                            print(f"Error processing font {i} in collection {font_path}: {e}")
-                except Exception as e:
-                    print(f"Error determining number of fonts in collection {font_path}: {e}")
-            else:
-                # Regular TTF/OTF file
+            ttc = ttLib.TTCollection(font_path, lazy=True)
+        except Exception as e:
+            print(f"Error determining number of fonts in collection {font_path}: {e}", file=sys.stderr)
+            return faces
+
+        try:
+            # Extract PostScript name from each font in the collection
+            for i, font in enumerate(ttc.fonts):
                 try:
-                    font = TTFont(font_path)
                     ps_name = _extract_postscript_name(font)
-                    if ps_name:
-                        postscript_names.append(ps_name)
-                    font.close()
+                    if ps_name and not ps_name.startswith('.'):
+                        faces.append({'name': ps_name, 'number': i, 'coverage': cmap_ranges(font)})
                 except Exception as e:
-                    print(f"Error processing font {font_path}: {e}")
+                    print(f"Error processing font {i} in collection {font_path}: {e}", file=sys.stderr)
+        finally:
+            ttc.close()
+    else:
+        # Regular TTF/OTF file
+        try:
+            font = ttLib.TTFont(font_path, lazy=True)
+            try:
+                ps_name = _extract_postscript_name(font)
+                if ps_name:
+                    faces.append({'name': ps_name, 'number': -1, 'coverage': cmap_ranges(font)})
+            finally:
+                font.close()
+        except Exception as e:
+            print(f"Error processing font {font_path}: {e}", file=sys.stderr)
+
+    return faces
+
+def read_postscript_names(font_path):
+    """
+    Returns the PostScript names of the fonts in a font file.
+
+    Args:
+        font_path (str): Path to a .ttf, .otf or .ttc file
+
+    Returns:
+        list: PostScript names, one per font in the file that has one
+    """
+    return [face['name'] for face in read_font_faces(font_path)]
+
+# Below this many files, scanning in one process is faster than starting a pool
+PARALLEL_SCAN_MIN_FILES = 64
+
+def scan_fonts(font_paths, workers=None):
+    """
+    Reads the PostScript names and coverage of many font files, in parallel.
+
+    Args:
+        font_paths (list): Paths of font files
+        workers (int): Number of worker processes. Defaults to the number of
+            cores. Pass 1 to scan in this process.
+
+    Returns:
+        dict: Faces by font path, as returned by read_font_faces
+    """
+    font_paths = list(font_paths)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(font_paths) < PARALLEL_SCAN_MIN_FILES:
+        return {path: read_font_faces(path) for path in font_paths}
+
+    # Larger chunks keep the cost of passing work between processes down
+    chunksize = max(1, len(font_paths) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        faces = pool.map(read_font_faces, font_paths, chunksize=chunksize)
+        return dict(zip(font_paths, faces))
+
+def _file_key(font_path):
+    stat = os.stat(font_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def load_font_cache(cache_path=None):
+    """
+    Reads the font cache.
+
+    Returns:
+        dict: Cached entries by font path, each {"size", "mtime", "faces"}.
+            Empty if there is no cache or it can't be read.
+    """
+    cache_path = cache_path or font_cache_path()
+
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(data, dict) or data.get('version') != FONT_CACHE_VERSION:
+        return {}
+
+    return data.get('fonts', {})
+
+def save_font_cache(fonts, cache_path=None):
+    """
+    Writes the font cache, merged with any entries another process has
+    written since it was read.
+
+    The file is written to a temporary file and moved into place, so readers
+    never see a partly written cache.
+
+    Args:
+        fonts (dict): Entries by font path, each {"size", "mtime", "faces"}
+    """
+    cache_path = cache_path or font_cache_path()
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+        # Keep valid entries other processes found for files not in this scan
+        merged = {
+            path: entry for path, entry in load_font_cache(cache_path).items()
+            if path not in fonts and os.path.exists(path)
+        }
+        merged.update(fonts)
+
+        fd, tmp_path = tempfile.mkstemp(
+            prefix='fonts.', suffix='.tmp', dir=os.path.dirname(cache_path)
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': FONT_CACHE_VERSION, 'fonts': merged}, f)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        print(f"Error writing font cache {cache_path}: {e}", file=sys.stderr)
+
+def list_installed_fonts(use_cache=True, font_dirs=None, cache_path=None):
+    """
+    Returns the file and character coverage of every font installed on the
+    system. Works on both Windows and macOS.
+
+    Fonts are cached on disk by font file path, size and modification time,
+    so only new or changed font files are read.
+
+    Args:
+        use_cache (bool): Whether to use and update the font cache
+        font_dirs (list): Directories to search. Defaults to the system font
+            directories.
+        cache_path (str): Font cache file. Defaults to font_cache_path().
+
+    Returns:
+        dict: {"path", "number", "coverage"} by PostScript name, as
+            returned by read_font_faces
+    """
+    font_files = list_font_files(font_dirs)
+    if font_files is None:
+        return {}
+
+    cache = load_font_cache(cache_path) if use_cache else {}
+    fonts = {}
+    stale = {}
+
+    # Use cached entries for files that have not changed
+    for font_path in font_files:
+        try:
+            size, mtime = _file_key(font_path)
+        except OSError as e:
+            print(f"Error with font file {font_path}: {e}", file=sys.stderr)
+            continue
+
+        entry = cache.get(font_path)
+        if entry is None or entry.get('size') != size or entry.get('mtime') != mtime:
+            stale[font_path] = {'size': size, 'mtime': mtime}
+        else:
+            fonts[font_path] = entry
+
+    # Read the rest
+    for font_path, faces in scan_fonts(stale).items():
+        fonts[font_path] = dict(stale[font_path], faces=faces)
+
+    changed = len(stale) > 0
+
+    if use_cache and (changed or len(fonts) != len(cache)):
+        save_font_cache(fonts, cache_path)
+
+    return {
+        face['name']: {'path': font_path, 'number': face['number'], 'coverage': face['coverage']}
+        for font_path, entry in fonts.items() for face in entry['faces']
+    }
+
+def list_all_fonts_postscript(use_cache=True, font_dirs=None, cache_path=None):
+    """
+    Returns a list of PostScript names for all fonts installed on the system.
+    Works on both Windows and macOS.
+
+    Args:
+        use_cache (bool): Whether to use and update the font cache
+        font_dirs (list): Directories to search. Defaults to the system font
+            directories.
+        cache_path (str): Font cache file. Defaults to font_cache_path().
+    
+    Returns:
+        list: A list of PostScript font names as strings
+    """
+    return list(list_installed_fonts(use_cache, font_dirs, cache_path))
+
+def _normalize_font_name(name):
+    return re.sub(r'[^0-9a-z]', '', name.lower())
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class FontIndex:
+    """
+    In-memory index of font PostScript names for fuzzy search.
+
+    Names are matched ignoring case, spaces and punctuation, so "helvetica
+    bold" finds "Helvetica-Bold". Prefix and substring matches rank first,
+    then names sharing the most trigrams with the query.
+    """
+
+    # Candidates from the trigram index that are scored in detail
+    MAX_CANDIDATES = 200
+
+    def __init__(self, names):
+        self.names = sorted(set(names))
+        self._keys = [_normalize_font_name(name) for name in self.names]
+        self._exact = {name.lower(): name for name in self.names}
+
+        # Keys sorted for prefix lookups, with the index of each name
+        self._sorted = sorted((key, i) for i, key in enumerate(self._keys))
+        self._sorted_keys = [key for key, _ in self._sorted]
+
+        self._trigrams = {}
+        for i, key in enumerate(self._keys):
+            for trigram in _trigrams(key):
+                self._trigrams.setdefault(trigram, []).append(i)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        # PostScript names are case sensitive
+        return self._exact.get(name.lower()) == name
+
+    def match_case(self, name):
+        """Returns the indexed name that differs from a name only in case, or None."""
+        return self._exact.get(name.lower())
+
+    def _prefix_matches(self, key):
+        start = bisect.bisect_left(self._sorted_keys, key)
+        matches = []
+        for sorted_key, i in self._sorted[start:]:
+            if not sorted_key.startswith(key):
+                break
+            matches.append(i)
+        return matches
+
+    def search(self, query, limit=20):
+        """
+        Returns the font names that best match a query, best first.
+
+        Args:
+            query (str): All or part of a font name
+            limit (int): Maximum number of names to return
+
+        Returns:
+            list: PostScript names
+        """
+        key = _normalize_font_name(query)
+        if not key:
+            return self.names[:limit]
+
+        scores = {}
+
+        for i in self._prefix_matches(key):
+            # Shorter names are closer to what was typed
+            scores[i] = 3 + len(key) / len(self._keys[i])
+
+        query_trigrams = _trigrams(key)
+        shared = {}
+        for trigram in query_trigrams:
+            for i in self._trigrams.get(trigram, ()):
+                shared[i] = shared.get(i, 0) + 1
+
+        candidates = sorted(shared, key=shared.get, reverse=True)[:self.MAX_CANDIDATES]
+        for i in candidates:
+            if i in scores:
+                continue
+
+            candidate = self._keys[i]
+            if key in candidate:
+                score = 2 + len(key) / len(candidate)
+            else:
+                overlap = shared[i] / len(query_trigrams | _trigrams(candidate))
+                score = overlap + difflib.SequenceMatcher(None, key, candidate).ratio()
+
+            scores[i] = score
+
+        ranked = sorted(scores, key=lambda i: (-scores[i], self.names[i]))
+        return [self.names[i] for i in ranked[:limit]]
+
+    def suggest(self, name, limit=5):
+        """Returns names close to a name that is not in the index."""
+        return self.search(name, limit)
+
+def text_codepoints(text):
+    """
+    Returns the distinct codepoints in a string that a font needs glyphs for,
+    in order. Whitespace and control characters are left out, since they are
+    not drawn.
+    """
+    return sorted({
+        ord(ch) for ch in text
+        if not ch.isspace() and unicodedata.category(ch) != 'Cc'
+    })
+
+class FontCoverage:
+    """
+    Index of the characters each font has glyphs for.
+
+    The ranges of all fonts are held in two sorted arrays, each range keyed by
+    font number * 0x110000 + codepoint. Checking whether fonts cover a
+    codepoint is then one vectorized binary search across all of them, which
+    takes milliseconds over thousands of fonts.
+    """
+
+    # Codepoint keys of different fonts never overlap
+    _STRIDE = 0x110000
+
+    def __init__(self, coverage):
+        """
+        Args:
+            coverage (dict): Ranges by PostScript name, as returned by
+                cmap_ranges
+        """
+        self.names = sorted(coverage)
+        self._numbers = {name: i for i, name in enumerate(self.names)}
+
+        starts = []
+        ends = []
+        for i, name in enumerate(self.names):
+            ranges = np.asarray(coverage[name], dtype=np.int64).reshape(-1, 2)
+            offset = i * self._STRIDE
+            starts.append(ranges[:, 0] + offset)
+            ends.append(ranges[:, 1] + offset)
+
+        self._starts = np.concatenate(starts) if starts else np.empty(0, np.int64)
+        self._ends = np.concatenate(ends) if ends else np.empty(0, np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._numbers
+
+    def _covered(self, numbers, codepoints):
+        # covered[i, j] is whether font numbers[i] has a glyph for codepoints[j]
+        keys = numbers[:, None] * self._STRIDE + codepoints[None, :]
+        i = np.searchsorted(self._starts, keys, side='right') - 1
+        return (i >= 0) & (self._ends[np.maximum(i, 0)] >= keys)
+
+    def missing(self, name, text):
+        """
+        Returns the characters in text that a font has no glyphs for.
+
+        Args:
+            name (str): PostScript name of an indexed font
+            text (str): Text to check
+
+        Returns:
+            str: Missing characters, each once, in codepoint order. Empty if
+                the font covers the text.
+        """
+        codepoints = np.array(text_codepoints(text), dtype=np.int64)
+        if len(codepoints) == 0:
+            return ''
+
+        covered = self._covered(np.array([self._numbers[name]], dtype=np.int64), codepoints)[0]
+        return ''.join(chr(c) for c in codepoints[~covered])
+
+    def fonts_covering(self, text, names=None):
+        """
+        Returns the fonts that have glyphs for every character in text.
+
+        Args:
+            text (str): Text to check
+            names (list): Fonts to consider, in the order to return them.
+                Defaults to all indexed fonts, alphabetically.
+
+        Returns:
+            list: PostScript names
+        """
+        if names is None:
+            names = self.names
+        else:
+            names = [name for name in names if name in self._numbers]
+
+        codepoints = np.array(text_codepoints(text), dtype=np.int64)
+        if len(codepoints) == 0 or len(names) == 0:
+            return list(names)
+
+        # Check the highest codepoints first. Few fonts cover them, so most
+        # fonts are ruled out before the common ones are checked.
+        positions = np.arange(len(names))
+        numbers = np.array([self._numbers[name] for name in names], dtype=np.int64)
+        for codepoint in codepoints[::-1]:
+            covered = self._covered(numbers, codepoint[None])[:, 0]
+            positions = positions[covered]
+            numbers = numbers[covered]
+            if len(numbers) == 0:
+                break
+
+        return [names[i] for i in positions]
+
+class FontDiscovery:
+    """
+    Finds the installed fonts on a background thread, so servers can start
+    answering requests straight away.
+
+    Callers that need the font names wait for them with names() or
+    wait_names(). Everything else can check ready without waiting.
+
+    discover returns the file and coverage of each font by PostScript name,
+    as list_installed_fonts does.
+    """
+
+    def __init__(self, discover=list_installed_fonts):
+        self._discover = discover
+        self._fonts = None
+        self._index = None
+        self._coverage = None
+        self._done = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Starts discovery, if it has not been started already."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="font-discovery", daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self._fonts = self._discover()
         except Exception as e:
-            print(f"Error with font file {font_path}: {e}")
- 
-    return list(set(postscript_names))
+            print(f"Error discovering fonts: {e}", file=sys.stderr)
+            self._fonts = {}
+        finally:
+            self._done.set()
+
+    @property
+    def ready(self):
+        """Whether discovery has finished."""
+        return self._done.is_set()
+
+    def wait_names(self, timeout=None):
+        """
+        Returns the font names, waiting for discovery to finish. Starts
+        discovery if needed.
+
+        Returns:
+            list: PostScript names, or None if timeout passed first
+        """
+        self.start()
+        if not self._done.wait(timeout):
+            return None
+        return list(self._fonts)
+
+    async def names(self):
+        """Returns the font names, waiting for discovery without blocking the event loop."""
+        self.start()
+        if not self._done.is_set():
+            await asyncio.get_running_loop().run_in_executor(None, self._done.wait)
+        return list(self._fonts)
+
+    async def index(self):
+        """Returns a FontIndex of the font names, waiting for discovery if needed."""
+        names = await self.names()
+
+        with self._lock:
+            if self._index is None:
+                self._index = FontIndex(names)
+            return self._index
+
+    async def coverage(self):
+        """Returns a FontCoverage of the fonts, waiting for discovery if needed."""
+        await self.names()
+
+        with self._lock:
+            if self._coverage is None:
+                self._coverage = FontCoverage({
+                    name: font['coverage'] for name, font in self._fonts.items()
+                })
+            return self._coverage
+
+    async def font_file(self, name):
+        """
+        Returns the file a font is in, waiting for discovery if needed.
+
+        Returns:
+            tuple: (path, number within a .ttc collection or -1), or None if
+                the font was not found
+        """
+        await self.names()
+
+        font = self._fonts.get(name)
+        if font is None:
+            return None
+        return font['path'], font['number']
+
+font_discovery = FontDiscovery()
 
 def _extract_postscript_name(font):
     """
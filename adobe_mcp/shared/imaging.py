@@ -0,0 +1,471 @@
+# MIT License
+#
+# Copyright (c) 2025 Mike Chambers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Turning raw pixel buffers sent by the plugins into encoded images."""
+
+import asyncio
+import io
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+PILImage = lazy_import("PIL.Image")
+
+# Formats encode_image can produce, and the Pillow format name for each
+IMAGE_FORMATS = {
+    "png": "PNG",
+    "jpeg": "JPEG",
+    "webp": "WEBP",
+}
+
+# Color transparent pixels are composited onto when alpha is dropped
+WHITE = (255, 255, 255)
+
+# Pillow mode for each number of components per pixel
+_MODES = {
+    1: "L",
+    3: "RGB",
+    4: "RGBA",
+}
+
+# Encoding is CPU bound, and Pillow releases the GIL while it compresses, so
+# it runs on worker threads rather than blocking the event loop
+_executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="image-encode")
+
+# Pool for bulk work, such as exporting many layers, that should use every
+# core. Created on first use, since starting it is slow.
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _mode(components):
+    mode = _MODES.get(components)
+    if mode is None:
+        raise ValueError(f"Unsupported number of components per pixel : {components}. Valid values are: {', '.join(map(str, _MODES))}")
+    return mode
+
+
+def get_process_pool():
+    """Returns the shared process pool, starting it if needed."""
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return _process_pool
+
+
+def pixels_from_buffer(data, width, height, components):
+    """
+    Wraps a buffer of 8 bit, interleaved pixels as an array, without copying.
+
+    Args:
+        data (bytes): Pixel data, row by row, with components values per pixel
+        width (int): Width of the image in pixels
+        height (int): Height of the image in pixels
+        components (int): Number of values per pixel (1, 3 or 4)
+
+    Returns:
+        numpy.ndarray: Read-only uint8 array with shape (height, width, components)
+    """
+    _mode(components)
+
+    expected = width * height * components
+    if len(data) != expected:
+        raise ValueError(f"Pixel buffer has {len(data)} bytes, expected {expected} for {width}x{height}x{components}")
+
+    return np.frombuffer(data, dtype=np.uint8).reshape((height, width, components))
+
+
+def encode_image(pixels, format="png", quality=None, background=WHITE):
+    """
+    Encodes an array of pixels as an image file.
+
+    Args:
+        pixels (numpy.ndarray): uint8 array with shape (height, width, components)
+        format (str): One of "png", "jpeg" or "webp"
+        quality (int): Quality from 1 to 100 for jpeg and webp. Ignored for png.
+        background (tuple): (red, green, blue) color that transparent pixels
+            are composited onto when saving as jpeg, which has no alpha channel
+
+    Returns:
+        bytes: The encoded image
+    """
+    if format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format : {format}. Valid values are: {', '.join(IMAGE_FORMATS)}")
+
+    # Crops of a larger array are views with gaps between rows
+    pixels = np.ascontiguousarray(pixels)
+
+    mode = _mode(pixels.shape[2])
+    image = PILImage.frombuffer(mode, (pixels.shape[1], pixels.shape[0]), pixels, "raw", mode, 0, 1)
+
+    if format == "jpeg" and image.mode == "RGBA":
+        # Dropping the alpha channel would reveal whatever color transparent
+        # pixels happen to hold, which is usually black
+        flat = PILImage.new("RGB", image.size, tuple(background))
+        flat.paste(image, mask=image.getchannel("A"))
+        image = flat
+
+    options = {}
+    if quality is not None and format != "png":
+        options["quality"] = quality
+
+    out = io.BytesIO()
+    image.save(out, IMAGE_FORMATS[format], **options)
+    return out.getvalue()
+
+
+async def encode_image_async(pixels, format="png", quality=None, background=WHITE):
+    """Version of encode_image that runs on a worker thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, encode_image, pixels, format, quality, background)
+
+
+def fit_size(width, height, max_edge):
+    """
+    Returns the size an image must be scaled to so its longest edge is at
+    most max_edge, keeping its aspect ratio. Images are never enlarged.
+
+    Returns:
+        tuple: (width, height)
+    """
+    if not max_edge or max(width, height) <= max_edge:
+        return width, height
+
+    scale = max_edge / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def resize_image(data, max_edge, format="jpeg", quality=None):
+    """
+    Scales an encoded image down so its longest edge is at most max_edge, and
+    re-encodes it.
+
+    Args:
+        data (bytes): The encoded image
+        max_edge (int): Maximum width or height of the result, in pixels
+        format (str): One of "png", "jpeg" or "webp"
+        quality (int): Quality from 1 to 100 for jpeg and webp. Ignored for png.
+
+    Returns:
+        tuple: (bytes, width, height) of the re-encoded image
+    """
+    image = PILImage.open(io.BytesIO(data))
+    size = fit_size(image.width, image.height, max_edge)
+
+    # Lets the JPEG decoder skip detail that would be scaled away anyway
+    image.draft(image.mode, size)
+    if image.size != size:
+        image = image.resize(size, PILImage.LANCZOS)
+
+    pixels = np.asarray(image.convert("RGBA" if "A" in image.getbands() else "RGB"))
+    return encode_image(pixels, format, quality), size[0], size[1]
+
+
+async def resize_image_async(data, max_edge, format="jpeg", quality=None):
+    """Version of resize_image that runs on a worker thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, resize_image, data, max_edge, format, quality)
+
+
+# Random odd multipliers for block_hashes, fixed so hashes are comparable
+# between captures
+_HASH_WEIGHTS = {}
+
+
+def _hash_weights(size):
+    weights = _HASH_WEIGHTS.get(size)
+    if weights is None:
+        rng = np.random.default_rng(0x5EED)
+        weights = rng.integers(0, 2**63, size=size, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        _HASH_WEIGHTS[size] = weights
+    return weights
+
+
+def block_hashes(pixels, block_size):
+    """
+    Hashes each block_size x block_size block of an image.
+
+    Each block's hash is a weighted sum of its values, read as 32 bit words,
+    with random 64 bit weights and wrap-around arithmetic. The image is
+    hashed one row of blocks at a time, so only that strip is ever widened
+    to 64 bits. Blocks on the right and bottom edges are padded with zeros.
+
+    Args:
+        pixels (numpy.ndarray): uint8 array with shape (height, width, components)
+        block_size (int): Width and height of each block, in pixels
+
+    Returns:
+        numpy.ndarray: uint64 array with shape (rows, columns) of blocks
+    """
+    height, width, components = pixels.shape
+    rows = -(-height // block_size)
+    columns = -(-width // block_size)
+
+    hashes = np.empty((rows, columns), dtype=np.uint64)
+    padded = None
+
+    for row in range(rows):
+        strip = pixels[row * block_size:(row + 1) * block_size]
+
+        if strip.shape[0] != block_size or columns * block_size != width:
+            if padded is None:
+                padded = np.zeros((block_size, columns * block_size, components), dtype=np.uint8)
+            padded[:] = 0
+            padded[:strip.shape[0], :width] = strip
+            strip = padded
+
+        # (columns, values in each block), each block's values contiguous
+        blocks = strip.reshape(block_size, columns, block_size, components).swapaxes(0, 1)
+        blocks = np.ascontiguousarray(blocks).reshape(columns, -1)
+        if blocks.shape[1] % 4 == 0:
+            blocks = blocks.view(np.uint32)
+
+        # Integer matrix products wrap around rather than overflowing
+        hashes[row] = blocks.astype(np.uint64) @ _hash_weights(blocks.shape[1])
+
+    return hashes
+
+
+async def block_hashes_async(pixels, block_size):
+    """Version of block_hashes that runs on a worker thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, block_hashes, pixels, block_size)
+
+
+def dirty_regions(dirty):
+    """
+    Groups changed blocks into rectangles.
+
+    Args:
+        dirty (numpy.ndarray): Boolean array with shape (rows, columns), True
+            for each block that changed
+
+    Returns:
+        list: (top, left, bottom, right) of each group of touching blocks,
+            in blocks, with bottom and right exclusive
+    """
+    rows, columns = dirty.shape
+    seen = np.zeros_like(dirty, dtype=bool)
+    regions = []
+
+    for row, column in zip(*np.nonzero(dirty)):
+        if seen[row, column]:
+            continue
+
+        top, left, bottom, right = row, column, row + 1, column + 1
+        stack = [(row, column)]
+        seen[row, column] = True
+
+        while stack:
+            r, c = stack.pop()
+            top, left = min(top, r), min(left, c)
+            bottom, right = max(bottom, r + 1), max(right, c + 1)
+
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < rows and 0 <= nc < columns and dirty[nr, nc] and not seen[nr, nc]:
+                    seen[nr, nc] = True
+                    stack.append((nr, nc))
+
+        regions.append((int(top), int(left), int(bottom), int(right)))
+
+    return regions
+
+
+def alpha_bounds(pixels):
+    """
+    Returns the bounds of the non-transparent pixels of an RGBA image.
+
+    Returns:
+        tuple: (left, top, right, bottom) with right and bottom exclusive, or
+            None if every pixel is transparent
+    """
+    alpha = pixels[:, :, 3] if pixels.shape[2] == 4 else None
+    if alpha is None:
+        return 0, 0, pixels.shape[1], pixels.shape[0]
+
+    rows = np.flatnonzero(alpha.any(axis=1))
+    if rows.size == 0:
+        return None
+    columns = np.flatnonzero(alpha.any(axis=0))
+
+    return int(columns[0]), int(rows[0]), int(columns[-1]) + 1, int(rows[-1]) + 1
+
+
+def export_layer_png(data, width, height, components, bounds, canvas, crop, file_path):
+    """
+    Saves the pixels of one layer as a PNG file. Runs in a worker process.
+
+    Args:
+        data (bytes): The layer's pixels, as sent by the plugin
+        width (int): Width of the pixels
+        height (int): Height of the pixels
+        components (int): Values per pixel (3 or 4)
+        bounds (dict): Where the pixels are on the canvas, with 'left' and 'top' keys
+        canvas (dict): Size of the document, with 'width' and 'height' keys
+        crop (bool): Whether to crop to the layer's visible pixels. Otherwise
+            the PNG is the size of the document, transparent outside the layer.
+        file_path (str): Where to save the PNG
+
+    Returns:
+        dict: 'filePath', 'width' and 'height' of the saved PNG, and the
+            document 'bounds' it covers
+    """
+    pixels = pixels_from_buffer(data, width, height, components)
+
+    if components == 3:
+        # Layers without transparency, such as the background
+        rgba = np.empty((height, width, 4), dtype=np.uint8)
+        rgba[:, :, :3] = pixels
+        rgba[:, :, 3] = 255
+        pixels = rgba
+
+    left, top = int(bounds["left"]), int(bounds["top"])
+
+    if crop:
+        visible = alpha_bounds(pixels) or (0, 0, min(1, width), min(1, height))
+        x0, y0, x1, y1 = visible
+        out = pixels[y0:y1, x0:x1]
+        left, top = left + x0, top + y0
+    else:
+        canvas_width, canvas_height = int(canvas["width"]), int(canvas["height"])
+        out = np.zeros((canvas_height, canvas_width, 4), dtype=np.uint8)
+
+        # Layers can extend past the canvas
+        x0, y0 = max(0, -left), max(0, -top)
+        x1 = min(width, canvas_width - left)
+        y1 = min(height, canvas_height - top)
+        if x1 > x0 and y1 > y0:
+            out[top + y0:top + y1, left + x0:left + x1] = pixels[y0:y1, x0:x1]
+        left, top = 0, 0
+
+    with open(file_path, "wb") as f:
+        f.write(encode_image(out, "png"))
+
+    return {
+        "filePath": file_path,
+        "width": out.shape[1],
+        "height": out.shape[0],
+        "bounds": {
+            "left": left,
+            "top": top,
+            "right": left + out.shape[1],
+            "bottom": top + out.shape[0],
+        },
+    }
+
+
+# File extension used for each format
+IMAGE_EXTENSIONS = {
+    "png": "png",
+    "jpeg": "jpg",
+    "webp": "webp",
+}
+
+
+def parse_size(size, width, height):
+    """
+    Returns the pixel size an image should be resized to for a size spec.
+
+    Args:
+        size (str): Either a scale, such as "2x" or "0.5x", or the length of
+            the longest edge, such as "256px"
+        width (int): Width of the original image
+        height (int): Height of the original image
+
+    Returns:
+        tuple: (width, height)
+    """
+    match = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*(x|px)\s*", str(size).lower())
+    if not match:
+        raise ValueError(f"Invalid size : {size}. Use a scale such as '2x' or a longest edge such as '256px'")
+
+    value, unit = float(match.group(1)), match.group(2)
+    if value <= 0:
+        raise ValueError(f"Invalid size : {size}. Sizes must be greater than 0")
+
+    scale = value if unit == "x" else value / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def export_variant(pixels, size, format, file_path, quality=None, background=WHITE):
+    """
+    Resizes an image, encodes it and saves it, timing each step.
+
+    Args:
+        pixels (numpy.ndarray): uint8 array with shape (height, width, components)
+        size (str): Size spec, as accepted by parse_size
+        format (str): One of "png", "jpeg" or "webp"
+        file_path (str): Where to save the file
+        quality (int): Quality from 1 to 100 for jpeg and webp. Ignored for png.
+        background (tuple): (red, green, blue) color transparent pixels are
+            composited onto for jpeg (see encode_image)
+
+    Returns:
+        dict: 'size', 'format', 'filePath', 'width', 'height', 'bytes', and
+            'resizeMs', 'encodeMs' and 'writeMs' timings
+    """
+    start = time.perf_counter()
+
+    height, width = pixels.shape[:2]
+    target = parse_size(size, width, height)
+
+    resized = pixels
+    if target != (width, height):
+        mode = _mode(pixels.shape[2])
+        image = PILImage.frombuffer(mode, (width, height), np.ascontiguousarray(pixels), "raw", mode, 0, 1)
+        resized = np.asarray(image.resize(target, PILImage.LANCZOS))
+    resized_at = time.perf_counter()
+
+    data = encode_image(resized, format, quality, background)
+    encoded_at = time.perf_counter()
+
+    with open(file_path, "wb") as f:
+        f.write(data)
+    written_at = time.perf_counter()
+
+    return {
+        "size": size,
+        "format": format,
+        "filePath": file_path,
+        "width": target[0],
+        "height": target[1],
+        "bytes": len(data),
+        "resizeMs": round((resized_at - start) * 1000, 1),
+        "encodeMs": round((encoded_at - resized_at) * 1000, 1),
+        "writeMs": round((written_at - encoded_at) * 1000, 1),
+    }
+
+
+async def export_variant_async(pixels, size, format, file_path, quality=None, background=WHITE):
+    """Version of export_variant that runs on a worker thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor, export_variant, pixels, size, format, file_path, quality, background
+    )
@@ -20,137 +20,403 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import socketio
+import asyncio
 import time
+import uuid
 import threading
-import json
-from queue import Queue
-import logger
+from . import logger
+from .lazy import lazy_import
+
+# The Socket.IO client pulls in aiohttp, so it is imported on first connect
+socketio = lazy_import("socketio")
 
 # Global configuration variables
 proxy_url = None
 proxy_timeout = None
 application = None
 
-def send_message_blocking(command, timeout=None):
+# Backoff used when (re)connecting to the proxy server
+CONNECT_ATTEMPTS = 3
+RECONNECT_DELAY = 0.5
+RECONNECT_DELAY_MAX = 5
+
+# errorType sent by the proxy when no plugin is registered for the application
+NO_TARGET = "NO_TARGET"
+
+_connection = None
+_connection_lock = threading.Lock()
+
+# Event loop used to run commands for blocking callers
+_blocking_loop = None
+_blocking_loop_lock = threading.Lock()
+
+
+# Strings longer than this are shortened when logged
+LOG_STRING_MAX = 200
+
+
+def describe(value):
     """
-    Blocking function that connects to a Socket.IO server, sends a message,
-    waits for a response, then disconnects.
-    
+    Returns a copy of a packet that is safe to log, with binary attachments
+    replaced by their size and long strings shortened.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+
+    if isinstance(value, str) and len(value) > LOG_STRING_MAX:
+        return f"{value[:LOG_STRING_MAX]}... <{len(value)} chars>"
+
+    if isinstance(value, dict):
+        return {k: describe(v) for k, v in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [describe(v) for v in value]
+
+    return value
+
+
+class ProxyConnection:
+    """
+    A long-lived Socket.IO connection to the command proxy server.
+
+    The connection is opened on first use and reused for every command. If the
+    proxy drops the connection it is re-established, with exponential backoff,
+    the next time a command is sent.
+
+    The connection lives on the event loop it was first used from. Commands
+    sent from any other loop are forwarded to it.
+    """
+
+    def __init__(self, url, loop):
+        self.url = url
+        self.loop = loop
+
+        # Reconnection is handled in ensure_connected() so that it happens on
+        # demand, when a command needs the connection.
+        self._sio = socketio.AsyncClient(logger=False, reconnection=False)
+        self._connect_lock = asyncio.Lock()
+
+        # Futures for commands still waiting on a response, by requestId.
+        # Many commands can be in flight on the socket at once.
+        self._pending = {}
+
+        # Callbacks for commands whose response is streamed in chunks, and
+        # the number of chunks received so far, by requestId
+        self._chunk_handlers = {}
+        self._chunk_counts = {}
+
+        self._backoff = RECONNECT_DELAY
+        self._next_attempt = 0
+
+        self._sio.on("connect", self._on_connect)
+        self._sio.on("disconnect", self._on_disconnect)
+        self._sio.on("packet_response", self._on_packet_response)
+        self._sio.on("packet_chunk", self._on_packet_chunk)
+
+    @property
+    def connected(self):
+        return self._sio.connected
+
+    @property
+    def usable(self):
+        # Commands can only be forwarded to a loop that is still running
+        return self.loop.is_running()
+
+    async def _on_connect(self):
+        logger.log(f"Connected to server with session ID: {self._sio.sid}")
+
+    async def _on_disconnect(self, *args):
+        logger.log("Disconnected from server")
+
+        # Wake up callers waiting on responses that will never arrive
+        pending = list(self._pending.values())
+        self._pending.clear()
+
+        for future in pending:
+            if not future.done():
+                future.set_result(None)
+
+    async def _on_packet_response(self, data):
+        logger.log(f"Received response: {describe(data)}")
+
+        request_id = data.get("requestId") if isinstance(data, dict) else None
+
+        if request_id is None and len(self._pending) == 1:
+            # Plugins that predate request ids can only be matched when a
+            # single command is in flight
+            request_id = next(iter(self._pending))
+        future = self._pending.pop(request_id, None)
+
+        if future is None or future.done():
+            logger.log(f"Dropping response for unknown request: {request_id}")
+            return
+
+        future.set_result(data)
+
+    async def _on_packet_chunk(self, data):
+        request_id = data.get("requestId")
+        on_chunk = self._chunk_handlers.get(request_id)
+
+        if on_chunk is None:
+            logger.log(f"Dropping chunk for unknown request: {request_id}")
+            return
+
+        self._chunk_counts[request_id] += 1
+        try:
+            on_chunk(data["chunk"])
+        except Exception as e:
+            logger.log(f"Error handling chunk for request {request_id}: {e}")
+
+    async def ensure_connected(self):
+        """
+        Connects to the proxy server if not already connected.
+
+        Raises:
+            RuntimeError: If the proxy server could not be reached.
+        """
+        if self._sio.connected:
+            return
+
+        async with self._connect_lock:
+            if self._sio.connected:
+                return
+
+            last_error = None
+            for attempt in range(CONNECT_ATTEMPTS):
+                # Respect the backoff from earlier failures so a dead proxy
+                # is not hammered by every tool call
+                wait = self._next_attempt - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                try:
+                    await self._sio.connect(self.url, transports=['websocket'])
+                    self._backoff = RECONNECT_DELAY
+                    self._next_attempt = 0
+                    return
+                except Exception as e:
+                    last_error = e
+                    logger.log(f"Connection error (attempt {attempt + 1}/{CONNECT_ATTEMPTS}): {e}")
+                    self._next_attempt = time.monotonic() + self._backoff
+                    self._backoff = min(self._backoff * 2, RECONNECT_DELAY_MAX)
+
+            raise RuntimeError(f"Error: Could not connect to {application} command proxy server. Make sure that the proxy server is running listening on the correct url {self.url}. Original error: {last_error}")
+
+    async def send(self, command, timeout, on_chunk=None):
+        """
+        Sends a command packet and waits for its response.
+
+        Args:
+            command (dict): The command to send
+            timeout (int): Maximum time to wait for response in seconds. For
+                streamed responses, the maximum time between chunks.
+            on_chunk (callable): Called with each chunk the plugin sends
+                before its response. Runs on the connection's event loop.
+
+        Returns:
+            dict: The response received from the server, or None if the
+                connection was lost before a response arrived
+
+        Raises:
+            asyncio.TimeoutError: If no response arrived within timeout
+        """
+        if asyncio.get_running_loop() is not self.loop:
+            future = asyncio.run_coroutine_threadsafe(self.send(command, timeout, on_chunk), self.loop)
+            return await asyncio.wrap_future(future)
+
+        await self.ensure_connected()
+
+        request_id = command["requestId"]
+        future = self.loop.create_future()
+        self._pending[request_id] = future
+
+        if on_chunk is not None:
+            self._chunk_handlers[request_id] = on_chunk
+            self._chunk_counts[request_id] = 0
+
+        try:
+            target = command.get("application", application)
+            logger.log(f"Sending message to {target}: {describe(command)}")
+            await self._sio.emit('command_packet', {
+                'type': "command",
+                'application': target,
+                'command': command
+            })
+
+            logger.log("waiting for response...")
+            while True:
+                received = self._chunk_counts.get(request_id)
+                try:
+                    return await asyncio.wait_for(asyncio.shield(future), timeout)
+                except asyncio.TimeoutError:
+                    # A stream that is still sending chunks has not timed out
+                    if received is None or self._chunk_counts[request_id] == received:
+                        raise
+        finally:
+            self._pending.pop(request_id, None)
+            self._chunk_handlers.pop(request_id, None)
+            self._chunk_counts.pop(request_id, None)
+
+    async def close(self):
+        if asyncio.get_running_loop() is not self.loop:
+            if self.usable:
+                future = asyncio.run_coroutine_threadsafe(self.close(), self.loop)
+                await asyncio.wrap_future(future)
+            return
+
+        if self._sio.connected:
+            await self._sio.disconnect()
+
+
+async def connect():
+    """
+    Returns the shared proxy connection, connecting if needed.
+
+    Returns:
+        ProxyConnection: The connection used for all commands.
+    """
+    global _connection
+
+    if not proxy_url:
+        raise RuntimeError("Socket client not configured. Call configure() first.")
+
+    stale = None
+    with _connection_lock:
+        if _connection is None or _connection.url != proxy_url or not _connection.usable:
+            stale = _connection
+            _connection = ProxyConnection(proxy_url, asyncio.get_running_loop())
+        connection = _connection
+
+    if stale is not None and stale.usable:
+        await stale.close()
+
+    if connection.loop is asyncio.get_running_loop():
+        await connection.ensure_connected()
+    return connection
+
+
+async def disconnect():
+    """Closes the shared proxy connection, if open."""
+    global _connection
+
+    with _connection_lock:
+        connection = _connection
+        _connection = None
+
+    if connection is not None:
+        await connection.close()
+
+
+async def send_command(command, timeout=None, on_chunk=None):
+    """
+    Sends a command to the application over the shared proxy connection and
+    waits for the response.
+
+    Each command is tagged with a requestId so that any number of them can be
+    in flight on the shared connection.
+
     Args:
         command: The command to send
-        timeout (int): Maximum time to wait for response in seconds
-        
+        timeout (int): Maximum time to wait for response in seconds. For
+            streamed responses, the maximum time between chunks.
+        on_chunk (callable): Called with each chunk the plugin sends before
+            its response, for commands that stream their results
+
     Returns:
         dict: The response received from the server, or None if no response
     """
     # Use global variables
     global application, proxy_url, proxy_timeout
-    
+
+    # Commands name the application they are for. One process may serve
+    # several applications over the same connection.
+    target = command.get("application") or application
+
     # Check if configuration is set
-    if not application or not proxy_url or not proxy_timeout:
+    if not target or not proxy_url or not proxy_timeout:
         logger.log("Socket client not configured. Call configure() first.")
         return None
-    
+
     # Use provided timeout or default
     wait_timeout = timeout if timeout is not None else proxy_timeout
-    
-    # Create a standard (non-async) SocketIO client with WebSocket transport only
-    sio = socketio.Client(logger=False)
-    
-    # Use a queue to get the response from the event handler
-    response_queue = Queue()
-    
-    connection_failed = [False]         
-
-    @sio.event
-    def connect():
-        logger.log(f"Connected to server with session ID: {sio.sid}")
-        
-        # Send the command
-        logger.log(f"Sending message to {application}: {command}")
-        sio.emit('command_packet', {
-            'type': "command",
-            'application': application,
-            'command': command
-        })
-    
-    @sio.event
-    def packet_response(data):
-        logger.log(f"Received response: {data}")
-        response_queue.put(data)
-        # Disconnect after receiving the response
-        sio.disconnect()
-    
-    @sio.event
-    def disconnect():
-        logger.log("Disconnected from server")
-        # If we disconnect without response, put None in the queue
-        if response_queue.empty():
-            response_queue.put(None)
-    
-    @sio.event
-    def connect_error(error):
-        logger.log(f"Connection error: {error}")
-        connection_failed[0] = True
-        response_queue.put(None)
-    
-    # Connect in a separate thread to avoid blocking the main thread during connection
-    def connect_and_wait():
-        try:
-            sio.connect(proxy_url, transports=['websocket'])
-            # Keep the client running until disconnect is called
-            sio.wait()
-        except Exception as e:
-            logger.log(f"Error: {e}")
-            connection_failed[0] = True
-            if response_queue.empty():
-                response_queue.put(None)
-            if sio.connected:
-                sio.disconnect()
-    
-    # Start the client in a separate thread
-    client_thread = threading.Thread(target=connect_and_wait)
-    client_thread.daemon = True
-    client_thread.start()
-    
+
+    if "requestId" not in command:
+        command["requestId"] = uuid.uuid4().hex
+
+    connection = await connect()
+
     try:
-        # Wait for a response or timeout
-        logger.log("waiting for response...")
-        response = response_queue.get(timeout=wait_timeout)
-
-        if connection_failed[0]:
-            raise RuntimeError(f"Error: Could not connect to {application} command proxy server. Make sure that the proxy server is running listening on the correct url {proxy_url}.")
-
-        if response:
-            logger.log("response received...")
-            try:
-                logger.log(json.dumps(response))
-            except:
-                logger.log(f"Response (not JSON-serializable): {response}")
-
-            if response["status"] == "FAILURE":
-                raise AppError(f"Error returned from {application}: {response['message']}")
-            
-        return response
-    except AppError:
-        raise
-    except Exception as e:
+        response = await connection.send(command, wait_timeout, on_chunk)
+    except asyncio.TimeoutError as e:
         logger.log(f"Error waiting for response: {e}")
-        if sio.connected:
-            sio.disconnect()
-  
-        raise RuntimeError(f"Error: Could not connect to {application}. Connection Timed Out. Make sure that {application} is running and that the MCP Plugin is connected. Original error: {e}")
-    finally:
-        # Make sure client is disconnected
-        if sio.connected:
-            sio.disconnect()
-        # Wait for the thread to finish (should be quick after disconnect)
-        client_thread.join(timeout=1)
+        raise RuntimeError(f"Error: Could not connect to {target}. Connection Timed Out. Make sure that {target} is running and that the MCP Plugin is connected. Original error: {e}")
+
+    if response is None:
+        raise RuntimeError(f"Error: Lost connection to {target} command proxy server at {proxy_url} before a response was received.")
+
+    logger.log("response received...")
+
+    if response["status"] == "FAILURE" and response.get("errorType") == NO_TARGET:
+        raise NoTargetError(f"Error: {target} is not connected to the command proxy server at {proxy_url}. Make sure that {target} is running and that the MCP Plugin is connected.")
+
+    if response["status"] == "FAILURE":
+        raise AppError(f"Error returned from {target}: {response['message']}")
+
+    return response
+
+
+def run_blocking(coroutine):
+    """
+    Runs a coroutine to completion from synchronous code and returns its
+    result.
+
+    The coroutine runs on a background event loop shared by all blocking
+    callers, so it must not be called from a thread that is running the
+    event loop the proxy connection lives on.
+    """
+    global _blocking_loop
+
+    connection = _connection
+    if connection is not None and connection.usable and connection.loop.is_running():
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is connection.loop:
+            coroutine.close()
+            raise RuntimeError("Blocking call made from the event loop. Use 'await send_command(...)' instead.")
+
+    with _blocking_loop_lock:
+        if _blocking_loop is None:
+            _blocking_loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_blocking_loop.run_forever, name="socket-client-loop")
+            thread.daemon = True
+            thread.start()
+
+    return asyncio.run_coroutine_threadsafe(coroutine, _blocking_loop).result()
+
+
+def send_message_blocking(command, timeout=None):
+    """
+    Blocking version of send_command, for scripts.
+
+    Args:
+        command: The command to send
+        timeout (int): Maximum time to wait for response in seconds
+
+    Returns:
+        dict: The response received from the server, or None if no response
+    """
+    return run_blocking(send_command(command, timeout))
+
 
 class AppError(Exception):
     pass
 
+class NoTargetError(RuntimeError):
+    """Raised when no plugin is registered with the proxy for the application."""
+    pass
+
 def configure(app=None, url=None, timeout=None):
     
     global application, proxy_url, proxy_timeout
@@ -0,0 +1,305 @@
+# MIT License
+#
+# Copyright (c) 2025 Mike Chambers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+"""Predicting the size of text from the metrics in font files, without rendering it."""
+
+import functools
+import math
+import threading
+
+from .lazy import lazy_import
+
+boundsPen = lazy_import("fontTools.pens.boundsPen")
+ttLib = lazy_import("fontTools.ttLib")
+
+# Photoshop's automatic leading, as a fraction of the font size
+AUTO_LEADING = 1.2
+
+# Number of fonts whose metrics are kept open
+FONT_METRICS_CACHE_SIZE = 32
+
+
+def _x_advance(value_record):
+    if value_record is None:
+        return 0
+    return getattr(value_record, "XAdvance", 0) or 0
+
+
+class FontMetrics:
+    """
+    Glyph advances, kerning and glyph bounds for one font.
+
+    Advances and kerning pairs are read when the font is loaded. Glyph bounds
+    are read the first time each glyph is measured, so large CJK fonts load
+    quickly.
+
+    Kerning comes from the GPOS 'kern' feature, or the legacy 'kern' table
+    for fonts without one. Text is not shaped, so contextual forms,
+    ligatures and mark positioning (as used by Arabic and Indic scripts) are
+    not applied, and predictions for those scripts are approximate.
+    """
+
+    def __init__(self, font):
+        """
+        Args:
+            font: A TTFont object. It is kept open to read glyph bounds.
+        """
+        self._font = font
+        self._lock = threading.Lock()
+
+        self.units_per_em = font["head"].unitsPerEm
+
+        if "OS/2" in font:
+            os2 = font["OS/2"]
+            self.ascender, self.descender = os2.sTypoAscender, os2.sTypoDescender
+        else:
+            hhea = font["hhea"]
+            self.ascender, self.descender = hhea.ascent, hhea.descent
+
+        self.cmap = font.getBestCmap() or {}
+        self.advances = {name: advance for name, (advance, _) in font["hmtx"].metrics.items()}
+
+        self._glyph_set = font.getGlyphSet()
+        self._bounds = {}
+
+        self._kerning = self._read_gpos_kerning(font)
+        if not self._kerning and "kern" in font:
+            self._kerning = self._read_kern_table(font)
+
+    @staticmethod
+    def _read_gpos_kerning(font):
+        # Subtables of the pair adjustment lookups used by the 'kern'
+        # feature, in lookup order, each either ("pairs", first glyphs,
+        # {(first, second): advance}) or ("classes", first glyphs, subtable)
+        if "GPOS" not in font:
+            return []
+
+        gpos = font["GPOS"].table
+        if not gpos.FeatureList or not gpos.LookupList:
+            return []
+
+        lookup_indices = sorted({
+            index
+            for record in gpos.FeatureList.FeatureRecord
+            if record.FeatureTag == "kern"
+            for index in record.Feature.LookupListIndex
+        })
+
+        kerning = []
+        for index in lookup_indices:
+            lookup = gpos.LookupList.Lookup[index]
+            for subtable in lookup.SubTable:
+                if lookup.LookupType == 9:
+                    subtable = subtable.ExtSubTable
+                if getattr(subtable, "LookupType", lookup.LookupType) != 2:
+                    continue
+
+                first_glyphs = set(subtable.Coverage.glyphs)
+
+                if subtable.Format == 1:
+                    pairs = {}
+                    for first, pair_set in zip(subtable.Coverage.glyphs, subtable.PairSet):
+                        for record in pair_set.PairValueRecord:
+                            pairs[(first, record.SecondGlyph)] = _x_advance(record.Value1)
+                    kerning.append(("pairs", first_glyphs, pairs))
+                elif subtable.Format == 2:
+                    kerning.append(("classes", first_glyphs, subtable))
+
+        return kerning
+
+    @staticmethod
+    def _read_kern_table(font):
+        pairs = {}
+        for table in reversed(font["kern"].kernTables):
+            pairs.update(getattr(table, "kernTable", {}))
+        return [("pairs", {first for first, _ in pairs}, pairs)]
+
+    def kerning(self, first, second):
+        """Returns the kerning between two glyphs, in font units."""
+        for kind, first_glyphs, data in self._kerning:
+            if first not in first_glyphs:
+                continue
+
+            if kind == "pairs":
+                # A pair missing from this subtable may be in the next one
+                if (first, second) in data:
+                    return data[(first, second)]
+                continue
+
+            class1 = data.ClassDef1.classDefs.get(first, 0)
+            class2 = data.ClassDef2.classDefs.get(second, 0)
+            return _x_advance(data.Class1Record[class1].Class2Record[class2].Value1)
+
+        return 0
+
+    def glyph_name(self, character):
+        """Returns the glyph for a character, or .notdef if the font has none."""
+        return self.cmap.get(ord(character), ".notdef")
+
+    def glyph_bounds(self, name):
+        """Returns the (xMin, yMin, xMax, yMax) of a glyph in font units, or None if it is blank."""
+        with self._lock:
+            if name not in self._bounds:
+                pen = boundsPen.BoundsPen(self._glyph_set)
+                if name in self._glyph_set:
+                    self._glyph_set[name].draw(pen)
+                self._bounds[name] = pen.bounds
+            return self._bounds[name]
+
+    def measure_line(self, text):
+        """
+        Measures one line of text, with its origin on the baseline at the left.
+
+        Returns:
+            tuple: (advance, bounds) in font units, with bounds as
+                (xMin, yMin, xMax, yMax), or None if nothing is drawn
+        """
+        pen_x = 0
+        previous = None
+        bounds = None
+
+        for character in text:
+            name = self.glyph_name(character)
+            if previous is not None:
+                pen_x += self.kerning(previous, name)
+
+            glyph = self.glyph_bounds(name)
+            if glyph is not None:
+                x_min, y_min, x_max, y_max = glyph
+                glyph = (pen_x + x_min, y_min, pen_x + x_max, y_max)
+                if bounds is None:
+                    bounds = glyph
+                else:
+                    bounds = (
+                        min(bounds[0], glyph[0]), min(bounds[1], glyph[1]),
+                        max(bounds[2], glyph[2]), max(bounds[3], glyph[3]),
+                    )
+
+            pen_x += self.advances.get(name, 0)
+            previous = name
+
+        return pen_x, bounds
+
+
+@functools.lru_cache(maxsize=FONT_METRICS_CACHE_SIZE)
+def get_font_metrics(path, number=-1):
+    """
+    Returns the FontMetrics of a font file, loading it on first use.
+
+    Args:
+        path (str): Path to a .ttf, .otf or .ttc file
+        number (int): Number of the font within a .ttc collection
+
+    Returns:
+        FontMetrics
+    """
+    if number >= 0:
+        font = ttLib.TTFont(path, fontNumber=number, lazy=True)
+    else:
+        font = ttLib.TTFont(path, lazy=True)
+
+    return FontMetrics(font)
+
+
+def font_size_to_pixels(font_size, resolution):
+    """
+    Returns the em size in pixels of text set at font_size points, in a
+    document with the given resolution in pixels per inch.
+    """
+    return font_size * resolution / 72
+
+
+def measure_text(metrics, text, font_size, resolution=72, position=None):
+    """
+    Predicts the pixel bounds of a point text layer.
+
+    Args:
+        metrics (FontMetrics): Metrics of the layer's font
+        text (str): Text of the layer. Lines are separated by \\n or \\r, and
+            spaced with Photoshop's automatic leading.
+        font_size (float): Font size in points, as the text layer tools take it
+        resolution (float): Document resolution in pixels per inch
+        position (dict): Layer position, {"x", "y"}, with y the baseline of the
+            first line. Defaults to {"x": 0, "y": 0}.
+
+    Returns:
+        dict: 'bounds', the {"left", "top", "right", "bottom"} pixels the text
+            covers, as get_layer_bounds reports them (None if nothing is
+            drawn), 'width' and 'height' of the bounds, 'advance', the width
+            of the longest line including side bearings, 'ascent' and
+            'descent', the font's line extents above and below the baseline,
+            and 'leading', the distance between baselines
+    """
+    position = position or {"x": 0, "y": 0}
+    x, y = position["x"], position["y"]
+
+    em = font_size_to_pixels(font_size, resolution)
+    scale = em / metrics.units_per_em
+    leading = em * AUTO_LEADING
+
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+
+    advance = 0
+    bounds = None
+    for i, line in enumerate(lines):
+        line_advance, line_bounds = metrics.measure_line(line)
+        advance = max(advance, line_advance * scale)
+
+        if line_bounds is None:
+            continue
+
+        baseline = y + i * leading
+        x_min, y_min, x_max, y_max = line_bounds
+        line_bounds = (
+            x + x_min * scale, baseline - y_max * scale,
+            x + x_max * scale, baseline - y_min * scale,
+        )
+
+        if bounds is None:
+            bounds = line_bounds
+        else:
+            bounds = (
+                min(bounds[0], line_bounds[0]), min(bounds[1], line_bounds[1]),
+                max(bounds[2], line_bounds[2]), max(bounds[3], line_bounds[3]),
+            )
+
+    out = {
+        "bounds": None,
+        "width": 0,
+        "height": 0,
+        "advance": advance,
+        "ascent": metrics.ascender * scale,
+        "descent": -metrics.descender * scale,
+        "leading": leading,
+    }
+
+    if bounds is not None:
+        # Photoshop reports the whole pixels the text touches
+        left, top = math.floor(bounds[0]), math.floor(bounds[1])
+        right, bottom = math.ceil(bounds[2]), math.ceil(bounds[3])
+        out["bounds"] = {"left": left, "top": top, "right": right, "bottom": bottom}
+        out["width"] = right - left
+        out["height"] = bottom - top
+
+    return out
@@ -0,0 +1,124 @@
+"""
+Benchmarks font scanning in adobe_mcp.shared.fonts against the original
+serial implementation, on a generated corpus of fonts. The original only read
+names; the current scan also reads each font's character coverage.
+
+    python benchmarks/bench_fonts.py --fonts 400 --collections 40
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from fontTools.ttLib import TTCollection, TTFont
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from adobe_mcp.shared import fonts  # noqa: E402
+
+
+def build_font(family, glyph_count):
+    glyph_names = [".notdef"] + [f"g{i}" for i in range(glyph_count)]
+
+    fb = FontBuilder(1000, isTTF=True)
+    fb.setupGlyphOrder(glyph_names)
+    fb.setupCharacterMap({0x4E00 + i: f"g{i}" for i in range(glyph_count)})
+
+    glyphs = {}
+    for i, name in enumerate(glyph_names):
+        pen = TTGlyphPen(None)
+        pen.moveTo((0, 0))
+        pen.lineTo((i % 900 + 50, 700))
+        pen.lineTo((1000, i % 500))
+        pen.closePath()
+        glyphs[name] = pen.glyph()
+
+    fb.setupGlyf(glyphs)
+    fb.setupHorizontalMetrics({name: (1000, 0) for name in glyph_names})
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable({"familyName": family, "styleName": "Regular", "psName": f"{family}-Regular"})
+    fb.setupOS2()
+    fb.setupPost()
+    return fb.font
+
+
+def build_corpus(directory, font_count, collection_count, glyph_count):
+    for i in range(font_count):
+        build_font(f"Bench{i}", glyph_count).save(os.path.join(directory, f"bench{i}.ttf"))
+
+    for i in range(collection_count):
+        collection = TTCollection()
+        collection.fonts = [build_font(f"BenchCollection{i}Face{j}", glyph_count) for j in range(4)]
+        collection.save(os.path.join(directory, f"bench{i}.ttc"))
+
+
+def legacy_read_postscript_names(font_path):
+    """The scan list_all_fonts_postscript did before it was parallel and lazy."""
+    names = []
+
+    if font_path.lower().endswith(".ttc"):
+        ttc = TTFont(font_path, fontNumber=0)
+        num_fonts = ttc.reader.numFonts
+        ttc.close()
+
+        for i in range(num_fonts):
+            font = TTFont(font_path, fontNumber=i)
+            names.append(fonts._extract_postscript_name(font))
+            font.close()
+    else:
+        font = TTFont(font_path)
+        names.append(fonts._extract_postscript_name(font))
+        font.close()
+
+    return names
+
+
+def timed(label, f, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = f()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    count = sum(len(names) for names in result.values())
+    print(f"{label:<28} {best * 1000:9.1f} ms   {count} names")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fonts", type=int, default=400, help="number of .ttf files to generate")
+    parser.add_argument("--collections", type=int, default=40, help="number of 4 face .ttc files to generate")
+    parser.add_argument("--glyphs", type=int, default=500, help="glyphs per font")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes for the parallel scan")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scan, the best is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Generating {args.fonts} fonts and {args.collections} collections...")
+        build_corpus(directory, args.fonts, args.collections, args.glyphs)
+        paths = fonts.list_font_files([directory])
+
+        legacy = timed("original (serial, eager)", lambda: {p: legacy_read_postscript_names(p) for p in paths}, args.repeat)
+        lazy = timed("names + coverage, 1 process", lambda: fonts.scan_fonts(paths, workers=1), args.repeat)
+        parallel = timed(f"names + coverage, {args.workers} procs", lambda: fonts.scan_fonts(paths, workers=args.workers), args.repeat)
+
+        names = lambda scan: {path: [face["name"] for face in faces] for path, faces in scan.items()}
+        assert legacy == names(lazy) == names(parallel), "scans returned different names"
+
+        cache_path = os.path.join(directory, "cache", "fonts.json")
+        fonts.list_all_fonts_postscript(font_dirs=[directory], cache_path=cache_path)
+        timed(
+            "warm cache",
+            lambda: {"": fonts.list_all_fonts_postscript(font_dirs=[directory], cache_path=cache_path)},
+            args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Benchmarks how quickly each app server starts: the time from launching the
+process to its reply to the MCP initialize request, and to the reply to its
+first tool call, with the peak memory (RSS) of the process.
+
+Each server is run over stdio, as MCP clients run it. A stand-in plugin
+answers the commands the tools send, so no Adobe application is needed:
+
+- a Socket.IO server on the proxy port (3001) for Photoshop, Premiere and
+  InDesign, replying to every command with success
+- an HTTP server on the Illustrator command port (8001)
+
+Compare the peak RSS of "host", which serves every application from one
+process, with the sum of the others.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --servers photoshop premiere
+"""
+
+import argparse
+import http.server
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import socketio
+import uvicorn
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+PROXY_PORT = 3001
+ILLUSTRATOR_COMMAND_PORT = 8001
+
+# Command line for each server, and the tool called once it has started
+SERVERS = {
+    "photoshop": (["-m", "adobe_mcp.photoshop"], "get_documents", {}),
+    "premiere": (["-m", "adobe_mcp.premiere"], "get_project_info", {}),
+    "indesign": (["-m", "adobe_mcp.indesign"], "create_document", {"width": 800, "height": 600}),
+    # Illustrator normally serves MCP over HTTP. Over stdio it builds the
+    # same server and tools.
+    "illustrator": (
+        ["-c", "from adobe_mcp.illustrator.server import mcp; mcp.run()"],
+        "execute_script",
+        {"script": "app.name"},
+    ),
+    # All of the above in one process
+    "host": (["-m", "adobe_mcp.host"], "photoshop_get_documents", {}),
+}
+
+
+class StandInPlugin:
+    """Socket.IO stand-in for the proxy and a plugin, replying to every command with success."""
+
+    def __init__(self, port):
+        self.sio = socketio.AsyncServer(async_mode="asgi")
+        self.sio.on("command_packet", self.on_command_packet)
+
+        config = uvicorn.Config(socketio.ASGIApp(self.sio), host="127.0.0.1", port=port, log_level="error")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    async def on_command_packet(self, sid, data):
+        command = data["command"]
+        await self.sio.emit("packet_response", {
+            "senderId": sid,
+            "requestId": command.get("requestId"),
+            "status": "SUCCESS",
+            "response": {},
+        }, to=sid)
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError(f"Could not start the stand-in plugin. Is port {PROXY_PORT} in use?")
+            time.sleep(0.01)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+class IllustratorCommandHandler(http.server.BaseHTTPRequestHandler):
+    """Stand-in for the Illustrator command box, accepting every script."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps({"status": "command received"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ServerProcess:
+    """An app server, talking MCP over its stdin and stdout."""
+
+    def __init__(self, args, timeout):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+
+        self.started = time.perf_counter()
+        self.process = subprocess.Popen(
+            [sys.executable, *args],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=ROOT,
+            env=env,
+        )
+
+        # Kill the server if it hangs, so readline returns
+        self.watchdog = threading.Timer(timeout, self.process.kill)
+        self.watchdog.start()
+
+    def send(self, message):
+        self.process.stdin.write(json.dumps(dict(message, jsonrpc="2.0")).encode("utf-8") + b"\n")
+        self.process.stdin.flush()
+
+    def request(self, request_id, method, params):
+        """Sends a request, and returns its result and the seconds since the process was started."""
+        self.send({"id": request_id, "method": method, "params": params})
+
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError(f"server exited before replying to {method}")
+
+            try:
+                message = json.loads(line)
+            except ValueError:
+                raise RuntimeError(f"server wrote a line that is not MCP to stdout: {line[:80]!r}")
+            if message.get("id") == request_id:
+                if "error" in message:
+                    raise RuntimeError(f"{method} failed: {message['error'].get('message')}")
+                return message["result"], time.perf_counter() - self.started
+
+    def close(self):
+        """Stops the server and returns its peak RSS in bytes, or None if it can't be measured."""
+        self.watchdog.cancel()
+        self.process.stdin.close()
+
+        try:
+            if hasattr(os, "wait4"):
+                try:
+                    _, _, usage = os.wait4(self.process.pid, 0)
+                except ChildProcessError:
+                    return None
+                self.process.returncode = 0
+
+                # Linux reports kilobytes, macOS bytes
+                return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+            self.process.wait()
+            return None
+        finally:
+            self.process.stdout.close()
+
+
+def run_once(name, timeout):
+    args, tool, arguments = SERVERS[name]
+    server = ServerProcess(args, timeout)
+
+    try:
+        _, initialized = server.request(1, "initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {"name": "bench_startup", "version": "1.0"},
+        })
+        server.send({"method": "notifications/initialized"})
+
+        result, first_tool = server.request(2, "tools/call", {"name": tool, "arguments": arguments})
+        if result.get("isError"):
+            raise RuntimeError(f"{tool} failed: {result['content'][0].get('text')}")
+    except Exception:
+        server.process.kill()
+        server.close()
+        raise
+
+    return initialized, first_tool, server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", nargs="+", choices=list(SERVERS), default=list(SERVERS), help="servers to run")
+    parser.add_argument("--runs", type=int, default=5, help="launches per server, the median is reported")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for a server to reply")
+    args = parser.parse_args()
+
+    plugin = StandInPlugin(PROXY_PORT)
+    plugin.start()
+
+    illustrator = http.server.ThreadingHTTPServer(("127.0.0.1", ILLUSTRATOR_COMMAND_PORT), IllustratorCommandHandler)
+    threading.Thread(target=illustrator.serve_forever, daemon=True).start()
+
+    print(f"{'server':<12} {'initialize':>12} {'first tool':>12} {'peak RSS':>10}")
+
+    try:
+        for name in args.servers:
+            runs = []
+            try:
+                for _ in range(args.runs):
+                    runs.append(run_once(name, args.timeout))
+            except Exception as e:
+                print(f"{name:<12} failed: {e}")
+                continue
+
+            initialized = statistics.median(run[0] for run in runs)
+            first_tool = statistics.median(run[1] for run in runs)
+            rss = [run[2] for run in runs if run[2] is not None]
+            rss = f"{statistics.median(rss) / 2**20:7.1f} MB" if rss else "n/a"
+
+            print(f"{name:<12} {initialized * 1000:9.1f} ms {first_tool * 1000:9.1f} ms {rss:>10}")
+    finally:
+        illustrator.shutdown()
+        plugin.stop()
+
+
+if __name__ == "__main__":
+    main()
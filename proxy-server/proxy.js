@@ -39,6 +39,11 @@ const io = new Server(server,
 
 const PORT = 3001
 
+// How each command is assigned to one of the plugins registered for its
+// application when more than one is connected. One of the keys of
+// dispatchPolicies below.
+const DISPATCH_POLICY = process.env.DISPATCH_POLICY || "least-in-flight";
+
 // Add middleware
 app.use(express.json());
 
@@ -51,6 +56,8 @@ app.get('/status', (req, res) => {
       acc[app] = applicationClients[app] ? applicationClients[app].size : 0;
       return acc;
     }, {}),
+    dispatchPolicy: DISPATCH_POLICY,
+    inFlight: Object.fromEntries(inFlight),
     uptime: process.uptime()
   };
   res.json(status);
@@ -58,6 +65,84 @@ app.get('/status', (req, res) => {
 // Track clients by application
 const applicationClients = {};
 
+// Commands sent to a plugin that have not been answered yet, by requestId
+const pendingRequests = new Map();
+
+// Number of unanswered commands per plugin client
+const inFlight = new Map();
+
+// Index of the next client to use per application for round-robin dispatch
+const roundRobinIndex = {};
+
+// Plugin clients that have reported having each document open, by document
+// id. Each application instance numbers its own documents, so several
+// clients can report the same id.
+const documentOwners = new Map();
+
+// Plugin client that last handled commands from each sender
+const senderAffinity = new Map();
+
+let nextRequestId = 0;
+
+const leastInFlight = (clients) => {
+    let best = clients[0];
+    for (const clientId of clients) {
+        if ((inFlight.get(clientId) || 0) < (inFlight.get(best) || 0)) {
+            best = clientId;
+        }
+    }
+    return best;
+};
+
+const dispatchPolicies = {
+    // the plugin with the fewest unanswered commands
+    "least-in-flight": (clients, packet) => {
+        return leastInFlight(clients);
+    },
+
+    // each plugin in turn
+    "round-robin": (clients, packet) => {
+        let i = roundRobinIndex[packet.application] || 0;
+        roundRobinIndex[packet.application] = (i + 1) % clients.length;
+        return clients[i % clients.length];
+    },
+
+    // the plugin that has the command's document open, otherwise the one that
+    // last served this sender, since commands act on that app's active document
+    "sticky-document": (clients, packet) => {
+        let options = (packet.command && packet.command.options) || {};
+        let documentId = options.documentId;
+
+        let previous = senderAffinity.get(packet.senderId);
+        if (!clients.includes(previous)) {
+            previous = undefined;
+        }
+
+        let owners = [...(documentOwners.get(documentId) || [])].filter(
+            (clientId) => clients.includes(clientId)
+        );
+
+        if (owners.length > 0) {
+            //more than one instance has a document with this id, so prefer
+            //the one this sender has been working with
+            if (previous && owners.includes(previous)) {
+                return previous;
+            }
+            return leastInFlight(owners);
+        }
+
+        if (previous) {
+            return previous;
+        }
+
+        return leastInFlight(clients);
+    },
+};
+
+if (!dispatchPolicies[DISPATCH_POLICY]) {
+    throw new Error(`Unknown DISPATCH_POLICY : ${DISPATCH_POLICY}. Valid values are: ${Object.keys(dispatchPolicies).join(", ")}`);
+}
+
 io.on('connection', (socket) => {
   console.log(`User connected: ${socket.id}`);
   
@@ -83,16 +168,36 @@ io.on('connection', (socket) => {
 
   socket.on('command_packet_response', ({ packet }) => {
     const senderId = packet.senderId;
+
+    let pending = pendingRequests.get(packet.requestId);
+    if (pending) {
+      pendingRequests.delete(packet.requestId);
+      inFlight.set(pending.clientId, Math.max(0, (inFlight.get(pending.clientId) || 0) - 1));
+    }
+
+    if (packet.document && packet.document.id !== undefined) {
+      if (!documentOwners.has(packet.document.id)) {
+        documentOwners.set(packet.document.id, new Set());
+      }
+      documentOwners.get(packet.document.id).add(socket.id);
+    }
   
     if (senderId) {
       
       io.to(senderId).emit('packet_response', packet);
-      console.log(`Sent confirmation to client ${senderId}`);
+      console.log(`Sent response for request ${packet.requestId} to client ${senderId}`);
     } else {
       console.log(`No sender ID provided in packet`);
     }
   });
 
+  // Part of a response, sent by a plugin before the command completes
+  socket.on('command_packet_chunk', ({ packet }) => {
+    if (packet.senderId) {
+      io.to(packet.senderId).emit('packet_chunk', packet);
+    }
+  });
+
   socket.on('command_packet', ({ application, command }) => {
     console.log(`Command from ${socket.id} for application ${application}:`, command);
     
@@ -106,11 +211,21 @@ io.on('connection', (socket) => {
 
     let packet = {
         senderId:socket.id,
+        requestId:command.requestId || `${socket.id}:${nextRequestId++}`,
         application:application,
         command:command
     }
 
-    sendToApplication(packet)
+    if (!sendToApplication(packet)) {
+        // Fail fast rather than leaving the caller waiting for a timeout
+        socket.emit('packet_response', {
+            senderId:socket.id,
+            requestId:packet.requestId,
+            status:"FAILURE",
+            errorType:"NO_TARGET",
+            message:`No ${application} plugin is connected to the proxy server`
+        });
+    }
     
     // Send response back to this client
     //socket.emit('json_response', { from: 'server', command });
@@ -118,6 +233,35 @@ io.on('connection', (socket) => {
   
   socket.on('disconnect', () => {
     console.log(`User disconnected: ${socket.id}`);
+
+    // Fail commands that were waiting on this client, if it was a plugin
+    for (const [requestId, pending] of pendingRequests) {
+      if (pending.clientId !== socket.id) {
+        continue;
+      }
+
+      pendingRequests.delete(requestId);
+      io.to(pending.senderId).emit('packet_response', {
+        senderId:pending.senderId,
+        requestId:requestId,
+        status:"FAILURE",
+        message:`${pending.application} plugin disconnected before responding`
+      });
+    }
+
+    inFlight.delete(socket.id);
+    senderAffinity.delete(socket.id);
+    for (const [key, clientId] of senderAffinity) {
+      if (clientId === socket.id) {
+        senderAffinity.delete(key);
+      }
+    }
+    for (const [documentId, owners] of documentOwners) {
+      owners.delete(socket.id);
+      if (owners.size === 0) {
+        documentOwners.delete(documentId);
+      }
+    }
     
     // Remove this client from all application registrations
     for (const app in applicationClients) {
@@ -130,19 +274,26 @@ io.on('connection', (socket) => {
   });
 });
 
-// Add a function to send messages to clients by application
+// Send a command to exactly one of the clients registered for its application
 function sendToApplication(packet) {
 
     let application = packet.application
     if (applicationClients[application]) {
-        console.log(`Sending to ${applicationClients[application].size} clients for ${application}`);
-    
-        let senderId = packet.senderId
-        // Loop through all client IDs for this application
-        applicationClients[application].forEach(clientId => {
-            io.to(clientId).emit('command_packet', packet);
-    });
-    return true;
+        let clients = [...applicationClients[application]];
+        let clientId = dispatchPolicies[DISPATCH_POLICY](clients, packet);
+
+        console.log(`Sending to client ${clientId} (1 of ${clients.length}) for ${application}`);
+
+        pendingRequests.set(packet.requestId, {
+            senderId:packet.senderId,
+            clientId:clientId,
+            application:application
+        });
+        inFlight.set(clientId, (inFlight.get(clientId) || 0) + 1);
+        senderAffinity.set(packet.senderId, clientId);
+
+        io.to(clientId).emit('command_packet', packet);
+        return true;
   }
   console.log(`No clients registered for application: ${application}`);
   return false;
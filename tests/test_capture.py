@@ -0,0 +1,100 @@
+"""Test tiling of document captures in adobe_mcp.photoshop.capture."""
+import numpy as np
+import pytest
+
+from adobe_mcp.photoshop import capture
+from adobe_mcp.photoshop.capture import CaptureCache, tile_bounds
+
+
+class FakeDocument:
+    """Answers the commands capture sends, as the plugin would for a document of the given size."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.regions = []
+
+    async def send_command(self, command):
+        options = command["options"]
+
+        if command["action"] == "getDocumentInfo":
+            return {"response": {"width": self.width, "height": self.height}}
+
+        # Clipped to the canvas, like getDocumentRegion
+        b = options["bounds"]
+        bounds = {
+            "left": max(0, b["left"]),
+            "top": max(0, b["top"]),
+            "right": min(self.width, b["right"]),
+            "bottom": min(self.height, b["bottom"]),
+        }
+        self.regions.append(bounds)
+
+        width, height = bounds["right"] - bounds["left"], bounds["bottom"] - bounds["top"]
+        return {"response": {
+            "imageData": bytes(width * height * 4),
+            "width": width,
+            "height": height,
+            "components": 4,
+            "bounds": bounds,
+        }}
+
+
+def test_tiles_cover_canvas_without_overlap():
+    tiles = list(tile_bounds(2500, 1100, 1024))
+
+    assert len(tiles) == 6
+    assert tiles[0] == {"left": 0, "top": 0, "right": 1024, "bottom": 1024}
+    assert tiles[-1] == {"left": 2048, "top": 1024, "right": 2500, "bottom": 1100}
+    assert sum((t["right"] - t["left"]) * (t["bottom"] - t["top"]) for t in tiles) == 2500 * 1100
+
+
+@pytest.mark.asyncio
+async def test_iter_document_tiles_reads_each_tile_in_order(monkeypatch):
+    document = FakeDocument(250, 110)
+    monkeypatch.setattr(capture, "send_command", document.send_command)
+
+    tiles = [tile async for tile in capture.iter_document_tiles(tile_size=100)]
+
+    # Three columns and two rows, row by row, with partial tiles on the right and bottom
+    assert [t["bounds"] for t in tiles] == [
+        {"left": 0, "top": 0, "right": 100, "bottom": 100},
+        {"left": 100, "top": 0, "right": 200, "bottom": 100},
+        {"left": 200, "top": 0, "right": 250, "bottom": 100},
+        {"left": 0, "top": 100, "right": 100, "bottom": 110},
+        {"left": 100, "top": 100, "right": 200, "bottom": 110},
+        {"left": 200, "top": 100, "right": 250, "bottom": 110},
+    ]
+    assert [t["pixels"].shape for t in tiles][-1] == (10, 50, 4)
+    assert document.regions == [t["bounds"] for t in tiles]
+
+
+def test_capture_cache_finds_changed_blocks():
+    cache = CaptureCache(block_size=16)
+    pixels = np.zeros((100, 60, 3), dtype=np.uint8)
+
+    assert cache.compare(1, pixels)["baseline"]
+    assert cache.compare(1, pixels.copy())["regions"] == []
+
+    edited = pixels.copy()
+    edited[40:50, 20:30] = 255
+    edited[99, 59] = 1
+
+    result = cache.compare(1, edited)
+    assert not result["baseline"]
+    assert result["regions"] == [(16, 32, 32, 64), (48, 96, 60, 100)]
+
+    # A different size can't be compared with the previous capture
+    assert cache.compare(1, edited[:50])["baseline"]
+
+
+@pytest.mark.asyncio
+async def test_capture_cache_compares_on_worker_thread():
+    cache = CaptureCache(block_size=16)
+    pixels = np.zeros((100, 60, 4), dtype=np.uint8)
+
+    assert (await cache.compare_async(1, pixels))["baseline"]
+
+    edited = pixels.copy()
+    edited[0, 0, 3] = 255
+    assert (await cache.compare_async(1, edited))["regions"] == [(0, 0, 16, 16)]
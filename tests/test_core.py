@@ -0,0 +1,28 @@
+"""Test command creation in adobe_mcp.shared.core."""
+import pytest
+
+from adobe_mcp.shared.core import createBatch, createCommand
+
+
+def test_batch_runs_commands_in_order():
+    batch = createBatch([
+        createCommand("selectLayer", {"layerId": 1}),
+        {"action": "deleteLayer"},
+    ], stop_on_error=False)
+
+    assert batch["action"] == "runBatch"
+    assert batch["options"] == {
+        "commands": [
+            {"action": "selectLayer", "options": {"layerId": 1}},
+            {"action": "deleteLayer", "options": {}},
+        ],
+        "stopOnError": False,
+    }
+
+
+def test_batch_rejects_invalid_commands():
+    with pytest.raises(ValueError, match="index 1"):
+        createBatch([{"action": "selectLayer"}, {"options": {}}])
+
+    with pytest.raises(ValueError, match="index 0"):
+        createBatch(["selectLayer"])
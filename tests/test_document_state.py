@@ -0,0 +1,190 @@
+"""Test merging of layer snapshots in adobe_mcp.shared.document_state."""
+import copy
+
+from adobe_mcp.shared.document_state import (
+    DocumentStateCache,
+    build_layer_tree,
+    flatten_layers,
+)
+
+TREE = [
+    {"name": "Title", "id": 4, "type": "TEXT"},
+    {"name": "Group 1", "id": 3, "type": "GROUP", "layers": [
+        {"name": "Layer 2", "id": 2, "type": "PIXEL"},
+        {"name": "Layer 1", "id": 1, "type": "PIXEL"},
+    ]},
+    {"name": "Background", "id": 0, "type": "PIXEL"},
+]
+
+
+def _response(revision, **snapshot):
+    return {
+        "status": "SUCCESS",
+        "snapshotRevision": {"documentId": 7, "epoch": "e1", "revision": revision},
+        **snapshot,
+    }
+
+
+def test_flatten_and_rebuild_round_trip():
+    flat = flatten_layers(TREE)
+
+    assert flat[2] == {"name": "Layer 2", "id": 2, "type": "PIXEL", "parentId": 3, "index": 0}
+    assert build_layer_tree(flat) == TREE
+
+
+def test_delta_is_merged_into_full_tree():
+    cache = DocumentStateCache()
+    assert cache.known_revision("photoshop") is None
+
+    cache.apply("photoshop", _response(1, layers=copy.deepcopy(TREE)))
+    assert cache.known_revision("photoshop") == {"documentId": 7, "epoch": "e1", "revision": 1}
+
+    response = cache.apply("photoshop", _response(2, layersDelta={
+        "baseRevision": 1,
+        "added": [{"name": "Layer 3", "id": 5, "type": "PIXEL", "parentId": 3, "index": 2}],
+        "changed": [{"name": "Heading", "id": 4, "type": "TEXT", "parentId": None, "index": 0}],
+        "removed": [0],
+    }))
+
+    assert "layersDelta" not in response
+    assert response["layers"] == [
+        {"name": "Heading", "id": 4, "type": "TEXT"},
+        {"name": "Group 1", "id": 3, "type": "GROUP", "layers": [
+            {"name": "Layer 2", "id": 2, "type": "PIXEL"},
+            {"name": "Layer 1", "id": 1, "type": "PIXEL"},
+            {"name": "Layer 3", "id": 5, "type": "PIXEL"},
+        ]},
+    ]
+    assert cache.known_revision("photoshop")["revision"] == 2
+
+
+def test_delta_from_unknown_base_drops_cached_tree():
+    cache = DocumentStateCache()
+    cache.apply("photoshop", _response(1, layers=copy.deepcopy(TREE)))
+
+    response = cache.apply("photoshop", _response(4, layersDelta={
+        "baseRevision": 3, "added": [], "changed": [], "removed": [],
+    }))
+
+    assert "layers" not in response
+    assert cache.known_revision("photoshop") is None
+
+
+def _snapshot(revision=1):
+    layers = copy.deepcopy(TREE)
+    layers[0]["bounds"] = {"left": 10, "top": 20, "right": 110, "bottom": 40}
+    return _response(
+        revision,
+        layers=layers,
+        document={"id": 7, "name": "Poster"},
+        documentInfo={"width": 800, "height": 600},
+        hasActiveSelection=False,
+    )
+
+
+def test_reads_are_served_from_fresh_cache():
+    cache = DocumentStateCache()
+    assert cache.get_layers("photoshop") is None
+
+    command = {"action": "getLayers"}
+    cache.command_sent("photoshop", command)
+    cache.command_finished("photoshop", command, _snapshot())
+
+    assert cache.get_layers("photoshop")["response"][1]["name"] == "Group 1"
+    assert cache.get_document_info("photoshop")["response"] == {"width": 800, "height": 600}
+    assert cache.get_layer_bounds("photoshop", 4)["response"]["right"] == 110
+    assert cache.get_layer_bounds("photoshop", 2) is None
+
+
+def test_cache_is_not_served_while_a_change_is_in_flight():
+    cache = DocumentStateCache()
+    cache.apply("photoshop", _snapshot())
+
+    command = {"action": "translateLayer"}
+    cache.command_sent("photoshop", command)
+    assert cache.get_layers("photoshop") is None
+
+    cache.command_finished("photoshop", command, _snapshot(2))
+    assert cache.get_layers("photoshop") is not None
+
+
+def test_failed_change_invalidates_cache():
+    cache = DocumentStateCache()
+    cache.apply("photoshop", _snapshot())
+
+    command = {"action": "deleteLayer"}
+    cache.command_sent("photoshop", command)
+    cache.command_finished("photoshop", command)
+
+    assert cache.get_layers("photoshop") is None
+
+
+def test_stale_cache_is_not_served():
+    cache = DocumentStateCache(max_age=0)
+    cache.apply("photoshop", _snapshot())
+
+    assert cache.get_document_info("photoshop") is None
+
+
+def test_reduced_snapshot_invalidates_after_change():
+    cache = DocumentStateCache()
+    cache.apply("photoshop", _response(1, layers=copy.deepcopy(TREE)))
+
+    save = {"action": "saveDocument"}
+    cache.command_sent("photoshop", save)
+    cache.command_finished("photoshop", save, {"status": "SUCCESS"})
+
+    assert cache.get_layers("photoshop") is None
+    # The plugin still has revision 1, so the next full snapshot is a delta
+    assert cache.known_revision("photoshop")["revision"] == 1
+
+    cache.command_finished("photoshop", {"action": "getLayers"}, _response(1, layersDelta={
+        "baseRevision": 1, "added": [], "changed": [], "removed": [],
+    }))
+    assert cache.get_layers("photoshop")["response"] == TREE
+
+
+def _sequence(sequence_id, name, clips=0):
+    return {"id": sequence_id, "name": name, "videoTracks": [{"index": 0, "tracks": [{"index": i} for i in range(clips)]}]}
+
+
+def test_sequence_delta_keeps_untouched_sequences():
+    cache = DocumentStateCache()
+    cache.apply("premiere", _response(1, sequences=[
+        dict(_sequence("a", "Intro"), isActive=True),
+        dict(_sequence("b", "Main"), isActive=False),
+    ]))
+
+    response = cache.apply("premiere", _response(2, sequencesDelta={
+        "baseRevision": 1,
+        "order": ["a", "b", "c"],
+        "activeSequenceId": "c",
+        "changed": [_sequence("b", "Main", clips=2), _sequence("c", "Outro")],
+        "removed": [],
+        "complete": False,
+    }))
+
+    assert [(s["id"], s["isActive"], len(s["videoTracks"][0]["tracks"])) for s in response["sequences"]] == [
+        ("a", False, 0),
+        ("b", False, 2),
+        ("c", True, 0),
+    ]
+    assert cache.get_sequences("premiere")["response"] == response["sequences"]
+
+
+def test_partial_sequence_delta_does_not_refresh_stale_cache():
+    cache = DocumentStateCache()
+    cache.apply("premiere", _response(1, sequences=[dict(_sequence("a", "Intro"), isActive=True)]))
+    cache.invalidate("premiere")
+
+    cache.apply("premiere", _response(2, sequencesDelta={
+        "baseRevision": 1, "order": ["a"], "activeSequenceId": "a",
+        "changed": [_sequence("a", "Intro", clips=1)], "removed": [], "complete": False,
+    }))
+    assert cache.get_sequences("premiere") is None
+
+    cache.apply("premiere", _response(2, sequencesDelta={
+        "baseRevision": 2, "order": ["a"], "activeSequenceId": "a",
+        "changed": [], "removed": [], "complete": True,
+    }))
+    assert cache.get_sequences("premiere")["response"][0]["videoTracks"][0]["tracks"] == [{"index": 0}]
@@ -0,0 +1,146 @@
+"""Test font discovery and the font cache in adobe_mcp.shared.fonts."""
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+from adobe_mcp.shared import fonts
+
+
+def _build_font(path, family, style="Regular", characters="A"):
+    glyph_names = [f"uni{ord(ch):04X}" for ch in characters]
+
+    fb = FontBuilder(1000, isTTF=True)
+    fb.setupGlyphOrder([".notdef"] + glyph_names)
+    fb.setupCharacterMap({ord(ch): name for ch, name in zip(characters, glyph_names)})
+
+    pen = TTGlyphPen(None)
+    pen.moveTo((0, 0))
+    pen.lineTo((500, 700))
+    pen.lineTo((1000, 0))
+    pen.closePath()
+    glyph = pen.glyph()
+
+    fb.setupGlyf({name: glyph for name in [".notdef"] + glyph_names})
+    fb.setupHorizontalMetrics({name: (1000, 0) for name in [".notdef"] + glyph_names})
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable({"familyName": family, "styleName": style, "psName": f"{family}-{style}"})
+    fb.setupOS2()
+    fb.setupPost()
+    fb.save(str(path))
+
+
+def test_names_are_cached_until_file_changes(tmp_path, monkeypatch):
+    font_dir = tmp_path / "fonts"
+    font_dir.mkdir()
+    cache_path = str(tmp_path / "cache" / "fonts.json")
+
+    _build_font(font_dir / "a.ttf", "Alpha")
+    _build_font(font_dir / "b.ttf", "Beta", "Bold")
+
+    names = fonts.list_all_fonts_postscript(font_dirs=[str(font_dir)], cache_path=cache_path)
+    assert sorted(names) == ["Alpha-Regular", "Beta-Bold"]
+    assert os.path.exists(cache_path)
+
+    reads = []
+    read = fonts.read_font_faces
+    monkeypatch.setattr(fonts, "read_font_faces", lambda path: reads.append(path) or read(path))
+
+    fonts.list_all_fonts_postscript(font_dirs=[str(font_dir)], cache_path=cache_path)
+    assert reads == []
+
+    _build_font(font_dir / "b.ttf", "Gamma")
+    os.utime(font_dir / "b.ttf", ns=(0, 1))
+
+    names = fonts.list_all_fonts_postscript(font_dirs=[str(font_dir)], cache_path=cache_path)
+    assert reads == [str(font_dir / "b.ttf")]
+    assert sorted(names) == ["Alpha-Regular", "Gamma-Regular"]
+
+
+def test_unreadable_cache_is_ignored(tmp_path):
+    cache_path = tmp_path / "fonts.json"
+    cache_path.write_text("{not json")
+
+    assert fonts.load_font_cache(str(cache_path)) == {}
+
+
+@pytest.mark.asyncio
+async def test_discovery_runs_in_background():
+    release = threading.Event()
+
+    def discover():
+        release.wait(5)
+        return {"Alpha-Regular": {"path": "alpha.ttf", "number": -1, "coverage": [65, 90]}}
+
+    discovery = fonts.FontDiscovery(discover).start()
+    assert not discovery.ready
+    assert discovery.wait_names(timeout=0.01) is None
+
+    release.set()
+    assert await discovery.names() == ["Alpha-Regular"]
+    assert discovery.ready
+    assert await discovery.font_file("Alpha-Regular") == ("alpha.ttf", -1)
+
+
+def test_font_index_search():
+    index = fonts.FontIndex([
+        "Helvetica", "Helvetica-Bold", "Helvetica-BoldOblique", "ArialMT", "Arial-BoldMT", "MyriadPro-Regular",
+    ])
+
+    assert index.search("helvetica bold", 2) == ["Helvetica-Bold", "Helvetica-BoldOblique"]
+    assert index.search("arial")[:2] == ["ArialMT", "Arial-BoldMT"]
+    assert index.suggest("Helvetca", 1) == ["Helvetica"]
+    assert index.search("boldmt", 1) == ["Arial-BoldMT"]
+    assert "ArialMT" in index
+    assert "arialmt" not in index
+    assert "Arial" not in index
+    assert index.match_case("arialmt") == "ArialMT"
+    assert index.match_case("Arial") is None
+
+
+def test_coverage_is_cached(tmp_path):
+    font_dir = tmp_path / "fonts"
+    font_dir.mkdir()
+    cache_path = str(tmp_path / "fonts.json")
+
+    _build_font(font_dir / "a.ttf", "Alpha", characters="ABCXY")
+
+    expected = {"Alpha-Regular": {"path": str(font_dir / "a.ttf"), "number": -1, "coverage": [65, 67, 88, 89]}}
+    assert fonts.list_installed_fonts(font_dirs=[str(font_dir)], cache_path=cache_path) == expected
+    assert fonts.load_font_cache(cache_path)[str(font_dir / "a.ttf")]["faces"] == [
+        {"name": "Alpha-Regular", "number": -1, "coverage": [65, 67, 88, 89]}
+    ]
+    assert fonts.list_installed_fonts(font_dirs=[str(font_dir)], cache_path=cache_path) == expected
+
+
+def test_fonts_covering_text():
+    coverage = fonts.FontCoverage({
+        "Latin-Regular": [32, 126],
+        "Cyrillic-Regular": [32, 126, 0x400, 0x4FF],
+        "CJK-Regular": [0x4E00, 0x9FFF],
+    })
+
+    assert coverage.fonts_covering("Привет, мир") == ["Cyrillic-Regular"]
+    assert coverage.fonts_covering("Hello") == ["Cyrillic-Regular", "Latin-Regular"]
+    assert coverage.fonts_covering("Hello", ["Latin-Regular", "Cyrillic-Regular"]) == ["Latin-Regular", "Cyrillic-Regular"]
+    assert coverage.fonts_covering("中文\n") == ["CJK-Regular"]
+    assert coverage.fonts_covering("Hi 中文") == []
+
+    assert coverage.missing("Latin-Regular", "Hi Мир") == "Мир"
+    assert coverage.missing("Cyrillic-Regular", "Hi Мир\r") == ""
+
+
+def test_importing_server_does_not_start_discovery():
+    # Process pool workers import the server again where processes are
+    # spawned, so starting discovery on import would start it in each one
+    code = (
+        "from adobe_mcp.photoshop import server\n"
+        "from adobe_mcp.shared import font_discovery\n"
+        "assert font_discovery._thread is None\n"
+    )
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
@@ -0,0 +1,45 @@
+"""Test the combined server in adobe_mcp.host."""
+import pytest
+
+from adobe_mcp.host import server as host
+from adobe_mcp.shared import core
+
+
+class RecordingClient:
+    """Stands in for socket_client, recording the commands sent."""
+
+    def __init__(self):
+        self.commands = []
+
+    async def send_command(self, command, timeout=None, on_chunk=None):
+        self.commands.append(command)
+        return {"status": "SUCCESS", "response": {}}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = RecordingClient()
+    monkeypatch.setattr(core, "socket_client", client)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_tools_are_namespaced():
+    names = {tool.name for tool in await host.mcp.list_tools()}
+
+    assert {"photoshop_get_documents", "premiere_get_project_info", "indesign_create_document", "illustrator_execute_script"} <= names
+    assert "get_documents" not in names
+
+    uris = {str(resource.uri) for resource in await host.mcp.list_resources()}
+    assert "config://photoshop/get_instructions" in uris
+
+
+@pytest.mark.asyncio
+async def test_commands_are_sent_to_the_tools_application(client):
+    await host.mcp.call_tool("photoshop_get_documents", {})
+    await host.mcp.call_tool("premiere_get_project_info", {})
+
+    assert [(c["application"], c["action"]) for c in client.commands] == [
+        ("photoshop", "getDocuments"),
+        ("premiere", "getProjectInfo"),
+    ]
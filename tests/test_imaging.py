@@ -0,0 +1,124 @@
+"""Test decoding of raw pixel captures in adobe_mcp.shared.imaging."""
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from adobe_mcp.shared.imaging import (
+    encode_image,
+    encode_image_async,
+    export_layer_png,
+    export_variant_async,
+    parse_size,
+    fit_size,
+    pixels_from_buffer,
+    resize_image,
+)
+
+
+def _buffer(width, height, components):
+    return bytes(np.arange(width * height * components, dtype=np.uint8))
+
+
+def test_pixels_wrap_buffer_without_copying():
+    data = _buffer(4, 3, 4)
+    pixels = pixels_from_buffer(data, 4, 3, 4)
+
+    assert pixels.shape == (3, 4, 4)
+    assert np.shares_memory(pixels, np.frombuffer(data, dtype=np.uint8))
+
+
+def test_pixels_reject_wrong_size():
+    with pytest.raises(ValueError):
+        pixels_from_buffer(_buffer(4, 3, 3), 4, 3, 4)
+
+
+def test_unsupported_components_are_rejected():
+    # Grayscale with alpha
+    with pytest.raises(ValueError, match="components"):
+        pixels_from_buffer(_buffer(4, 3, 2), 4, 3, 2)
+
+    with pytest.raises(ValueError, match="components"):
+        encode_image(np.zeros((3, 4, 2), dtype=np.uint8), "png")
+
+
+@pytest.mark.asyncio
+async def test_png_round_trips_exactly():
+    pixels = pixels_from_buffer(_buffer(16, 8, 4), 16, 8, 4)
+
+    png = await encode_image_async(pixels, "png")
+    decoded = Image.open(io.BytesIO(png))
+
+    assert decoded.mode == "RGBA"
+    assert np.array_equal(np.asarray(decoded), pixels)
+
+
+def test_jpeg_drops_alpha():
+    pixels = pixels_from_buffer(_buffer(16, 8, 4), 16, 8, 4)
+
+    decoded = Image.open(io.BytesIO(encode_image(pixels, "jpeg", quality=80)))
+    assert decoded.format == "JPEG"
+    assert decoded.mode == "RGB"
+
+
+def test_jpeg_composites_transparency_onto_background():
+    # Transparent black on the left, opaque red on the right
+    pixels = np.zeros((8, 16, 4), dtype=np.uint8)
+    pixels[:, 8:] = (255, 0, 0, 255)
+
+    decoded = np.asarray(Image.open(io.BytesIO(encode_image(pixels, "jpeg", quality=95))))
+    assert decoded[:, :6].min() > 245
+    assert decoded[:, 10:, 0].min() > 245 and decoded[:, 10:, 1:].max() < 10
+
+    decoded = np.asarray(Image.open(io.BytesIO(encode_image(pixels, "jpeg", 95, background=(0, 0, 255)))))
+    assert decoded[:, :6, 2].min() > 245 and decoded[:, :6, :2].max() < 10
+
+
+def test_resize_fits_longest_edge():
+    pixels = pixels_from_buffer(_buffer(600, 400, 3), 600, 400, 3)
+    jpeg = encode_image(pixels, "jpeg")
+
+    data, width, height = resize_image(jpeg, 150, "jpeg", quality=70)
+
+    assert (width, height) == (150, 100)
+    assert Image.open(io.BytesIO(data)).size == (150, 100)
+    assert fit_size(100, 50, 150) == (100, 50)
+
+
+def test_export_layer_crops_or_places_on_canvas(tmp_path):
+    pixels = np.zeros((10, 20, 4), dtype=np.uint8)
+    pixels[2:5, 3:9] = 255
+    data = pixels.tobytes()
+    bounds = {"left": 100, "top": 50, "right": 120, "bottom": 60}
+    canvas = {"width": 200, "height": 80}
+
+    cropped = export_layer_png(data, 20, 10, 4, bounds, canvas, True, str(tmp_path / "a.png"))
+    assert cropped["bounds"] == {"left": 103, "top": 52, "right": 109, "bottom": 55}
+    assert Image.open(tmp_path / "a.png").size == (6, 3)
+
+    placed = export_layer_png(data, 20, 10, 4, bounds, canvas, False, str(tmp_path / "b.png"))
+    assert (placed["width"], placed["height"]) == (200, 80)
+    image = np.asarray(Image.open(tmp_path / "b.png"))
+    assert image[52:55, 103:109].min() == 255
+    assert image[:, :, 3].sum() == 3 * 6 * 255
+
+
+def test_parse_size():
+    assert parse_size("2x", 300, 200) == (600, 400)
+    assert parse_size("0.5x", 300, 200) == (150, 100)
+    assert parse_size("150px", 300, 200) == (150, 100)
+
+    with pytest.raises(ValueError):
+        parse_size("large", 300, 200)
+
+
+@pytest.mark.asyncio
+async def test_export_variant_writes_file(tmp_path):
+    pixels = pixels_from_buffer(_buffer(64, 32, 4), 64, 32, 4)
+
+    result = await export_variant_async(pixels, "0.5x", "webp", str(tmp_path / "a@0.5x.webp"), quality=80)
+
+    assert (result["width"], result["height"]) == (32, 16)
+    assert result["bytes"] == (tmp_path / "a@0.5x.webp").stat().st_size
+    assert Image.open(tmp_path / "a@0.5x.webp").size == (32, 16)
@@ -0,0 +1,182 @@
+"""Test the pooled proxy connection in adobe_mcp.shared.socket_client."""
+import asyncio
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import socketio
+import uvicorn
+
+from adobe_mcp.shared import socket_client
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class FakeProxy:
+    """Stand-in for proxy-server/proxy.js with a plugin that echoes commands."""
+
+    def __init__(self):
+        self.port = _free_port()
+        self.connections = 0
+        self.sio = socketio.AsyncServer(async_mode="asgi")
+        self.sio.on("connect", self.on_connect)
+        self.sio.on("command_packet", self.on_command_packet)
+
+        config = uvicorn.Config(
+            socketio.ASGIApp(self.sio), host="127.0.0.1", port=self.port, log_level="error"
+        )
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    async def on_connect(self, sid, environ, auth=None):
+        self.connections += 1
+
+    async def on_command_packet(self, sid, data):
+        command = data["command"]
+
+        if command["options"].get("noTarget"):
+            await self.sio.emit("packet_response", {
+                "senderId": sid,
+                "requestId": command.get("requestId"),
+                "status": "FAILURE",
+                "errorType": "NO_TARGET",
+                "message": "No photoshop plugin is connected to the proxy server",
+            }, to=sid)
+            return
+
+        response = dict(command["options"])
+        if "binarySize" in response:
+            response["imageData"] = bytes(range(256)) * (response["binarySize"] // 256)
+
+        for i in range(command["options"].get("chunks", 0)):
+            await asyncio.sleep(command["options"].get("chunkDelay", 0))
+            await self.sio.emit("packet_chunk", {
+                "senderId": sid,
+                "requestId": command.get("requestId"),
+                "chunk": {"index": i},
+            }, to=sid)
+
+        await asyncio.sleep(command["options"].get("delay", 0))
+        await self.sio.emit("packet_response", {
+            "senderId": sid,
+            "requestId": command.get("requestId"),
+            "status": "SUCCESS",
+            "response": response,
+        }, to=sid)
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+@pytest.fixture
+def proxy():
+    p = FakeProxy()
+    p.start()
+    socket_client.configure(app="photoshop", url=p.url, timeout=5)
+    yield p
+    socket_client.run_blocking(socket_client.disconnect())
+    p.stop()
+
+
+def _command(**options):
+    return {"application": "photoshop", "action": "echo", "options": options}
+
+
+@pytest.mark.asyncio
+async def test_connection_is_reused(proxy):
+    for i in range(5):
+        response = await socket_client.send_command(_command(value=i))
+        assert response["response"]["value"] == i
+
+    assert proxy.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_responses_are_matched_by_request_id(proxy):
+    # Later commands answer first, so order-based matching would mix them up
+    delays = [0.3, 0.2, 0.1, 0.0]
+
+    start = time.monotonic()
+    results = await asyncio.gather(
+        *(socket_client.send_command(_command(delay=d)) for d in delays)
+    )
+    elapsed = time.monotonic() - start
+
+    assert [r["response"]["delay"] for r in results] == delays
+    # All four were in flight at once rather than one after another
+    assert elapsed < sum(delays)
+
+
+def test_blocking_calls_from_threads_share_the_connection(proxy):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(
+            lambda i: socket_client.send_message_blocking(_command(value=i)), range(20)
+        ))
+
+    assert [r["response"]["value"] for r in results] == list(range(20))
+    assert proxy.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_reconnects_after_disconnect(proxy):
+    await socket_client.send_command(_command(value=1))
+    await socket_client.disconnect()
+
+    response = await socket_client.send_command(_command(value=2))
+    assert response["response"]["value"] == 2
+    assert proxy.connections == 2
+
+
+@pytest.mark.asyncio
+async def test_no_target_fails_fast(proxy):
+    start = time.monotonic()
+    with pytest.raises(socket_client.NoTargetError):
+        await socket_client.send_command(_command(noTarget=True))
+
+    assert time.monotonic() - start < 1
+
+
+@pytest.mark.asyncio
+async def test_binary_attachments_arrive_as_bytes(proxy):
+    response = await socket_client.send_command(_command(binarySize=1024 * 1024))
+
+    assert isinstance(response["response"]["imageData"], bytes)
+    assert len(response["response"]["imageData"]) == 1024 * 1024
+    assert socket_client.describe(response)["response"]["imageData"] == "<1048576 bytes>"
+
+
+@pytest.mark.asyncio
+async def test_streamed_chunks_arrive_before_response(proxy):
+    chunks = []
+
+    # Takes longer than the timeout overall, but each chunk arrives within it
+    response = await socket_client.send_command(
+        _command(chunks=5, chunkDelay=0.2), timeout=0.5, on_chunk=chunks.append
+    )
+
+    assert [c["index"] for c in chunks] == list(range(5))
+    assert response["status"] == "SUCCESS"
+
+
+@pytest.mark.asyncio
+async def test_stream_times_out_when_chunks_stop(proxy):
+    with pytest.raises(RuntimeError):
+        await socket_client.send_command(
+            _command(chunks=1, delay=1), timeout=0.3, on_chunk=lambda chunk: None
+        )
@@ -0,0 +1,60 @@
+"""Test text measurement in adobe_mcp.shared.text_metrics."""
+import pytest
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+from adobe_mcp.shared import text_metrics
+
+
+def _build_font(path, kerning=None):
+    # Triangles 1000 units wide and 700 tall, on a 1000 unit em
+    fb = FontBuilder(1000, isTTF=True)
+    fb.setupGlyphOrder([".notdef", "A", "V", "space"])
+    fb.setupCharacterMap({ord("A"): "A", ord("V"): "V", ord(" "): "space"})
+
+    pen = TTGlyphPen(None)
+    pen.moveTo((0, 0))
+    pen.lineTo((500, 700))
+    pen.lineTo((1000, 0))
+    pen.closePath()
+    glyph = pen.glyph()
+
+    fb.setupGlyf({".notdef": glyph, "A": glyph, "V": glyph, "space": TTGlyphPen(None).glyph()})
+    fb.setupHorizontalMetrics({".notdef": (1000, 0), "A": (1000, 0), "V": (1000, 0), "space": (250, 0)})
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable({"familyName": "Metrics", "styleName": "Regular", "psName": "Metrics-Regular"})
+    fb.setupOS2(sTypoAscender=800, sTypoDescender=-200)
+    fb.setupPost()
+
+    if kerning:
+        fb.addOpenTypeFeatures(kerning)
+
+    fb.save(str(path))
+    return str(path)
+
+
+def test_measure_text_bounds(tmp_path):
+    metrics = text_metrics.get_font_metrics(_build_font(tmp_path / "plain.ttf"))
+
+    result = text_metrics.measure_text(metrics, "A A", 10, 144, {"x": 100, "y": 200})
+
+    # 10pt at 144ppi is a 20px em
+    assert result["bounds"] == {"left": 100, "top": 186, "right": 145, "bottom": 200}
+    assert result["advance"] == pytest.approx(45)
+    assert result["ascent"] == pytest.approx(16)
+    assert result["descent"] == pytest.approx(4)
+
+    two_lines = text_metrics.measure_text(metrics, "A\nA", 10, 72)
+    assert two_lines["bounds"] == {"left": 0, "top": -7, "right": 10, "bottom": 12}
+
+    assert text_metrics.measure_text(metrics, " ", 10, 72)["bounds"] is None
+
+
+def test_kerning_from_gpos(tmp_path):
+    path = _build_font(tmp_path / "kerned.ttf", "feature kern { pos A V -200; } kern;")
+    metrics = text_metrics.get_font_metrics(path)
+
+    assert metrics.kerning("A", "V") == -200
+    assert metrics.kerning("V", "A") == 0
+    assert text_metrics.measure_text(metrics, "AV", 10, 72)["width"] == 18
+    assert text_metrics.measure_text(metrics, "VA", 10, 72)["width"] == 20
@@ -41,6 +41,7 @@ const onCommandPacket = async (packet) => {
 
     let out = {
         senderId: packet.senderId,
+        requestId: packet.requestId,
     };
 
     try {
@@ -125,31 +125,118 @@ const placeImage = async (command) => {
     });
 };
 
+//reads pixels with imaging.getPixels and returns them either JPEG encoded
+//or, when raw is true, as uncompressed 8 bit interleaved pixels
+//
+//must be called from within a modal execute
+const _capturePixels = async (pixelsOpt, raw) => {
+    const imgObj = await imaging.getPixels({
+        //raw captures keep transparency, jpeg has no alpha channel
+        applyAlpha: !raw,
+        componentSize: 8,
+        //the server only handles RGB(A) pixels, so CMYK, Lab and grayscale
+        //documents are converted
+        colorSpace: "RGB",
+        ...pixelsOpt,
+    });
+    const imageData = imgObj.imageData;
+
+    let data;
+    if (raw) {
+        data = await imageData.getData({ chunky: true });
+    } else {
+        data = new Uint8Array(
+            await imaging.encodeImageData({
+                imageData: imageData,
+                base64: false,
+            })
+        );
+    }
+
+    const result = {
+        //sent as a Socket.IO binary attachment, so the bytes reach the
+        //client as is rather than base64 encoded in the JSON
+        imageData: data,
+        width: imageData.width,
+        height: imageData.height,
+        colorSpace: imageData.colorSpace,
+        components: imageData.components,
+        format: raw ? "raw" : "jpeg",
+    };
+
+    imageData.dispose();
+    return result;
+};
+
+//returns the composite image of the active document, either as a JPEG or,
+//with options.format "raw", as uncompressed 8 bit interleaved pixels
+//
+//options.maxEdge scales the image down so its longest side is at most that
+//many pixels
 const getDocumentImage = async (command) => {
+    let options = command.options || {};
+    let raw = options.format === "raw";
+
     let out = await execute(async () => {
+        const pixelsOpt = {};
 
-        const pixelsOpt = {
-            applyAlpha: true
-        };
+        let doc = app.activeDocument;
+        let maxEdge = options.maxEdge;
+        if (maxEdge && Math.max(doc.width, doc.height) > maxEdge) {
+            //photoshop scales the other side to keep the aspect ratio
+            pixelsOpt.targetSize =
+                doc.width >= doc.height ? { width: maxEdge } : { height: maxEdge };
+        }
 
-        const imgObj = await imaging.getPixels(pixelsOpt);
+        return await _capturePixels(pixelsOpt, raw);
+    });
 
-        const base64Data = await imaging.encodeImageData({
-            imageData: imgObj.imageData,
-            base64: true,
-        });
+    return out;
+};
+
+//returns the composite image of a rectangle of the active document, as a
+//JPEG or raw pixels (see getDocumentImage)
+//
+//options.bounds {left, top, right, bottom} is clipped to the canvas, and
+//options.scale scales the region (1 is full resolution)
+const getDocumentRegion = async (command) => {
+    let options = command.options;
+    let raw = options.format === "raw";
+    let scale = options.scale || 1;
+
+    let doc = app.activeDocument;
+    let b = options.bounds;
+
+    let sourceBounds = {
+        left: Math.max(0, Math.floor(b.left)),
+        top: Math.max(0, Math.floor(b.top)),
+        right: Math.min(doc.width, Math.ceil(b.right)),
+        bottom: Math.min(doc.height, Math.ceil(b.bottom)),
+    };
+
+    if (
+        sourceBounds.right <= sourceBounds.left ||
+        sourceBounds.bottom <= sourceBounds.top
+    ) {
+        throw new Error(
+            `getDocumentRegion : bounds ${JSON.stringify(b)} are outside the document`
+        );
+    }
+
+    let out = await execute(async () => {
+        const pixelsOpt = { sourceBounds };
+
+        if (scale !== 1) {
+            pixelsOpt.targetSize = {
+                width: Math.max(
+                    1,
+                    Math.round((sourceBounds.right - sourceBounds.left) * scale)
+                ),
+            };
+        }
 
-        const result = {
-            base64Image: base64Data,
-            dataUrl: `data:image/jpeg;base64,${base64Data}`,
-            width: imgObj.imageData.width,
-            height: imgObj.imageData.height,
-            colorSpace: imgObj.imageData.colorSpace,
-            components: imgObj.imageData.components,
-            format: "jpeg",
-        };
-
-        imgObj.imageData.dispose();
+        let result = await _capturePixels(pixelsOpt, raw);
+        result.bounds = sourceBounds;
         return result;
     });
 
@@ -433,6 +520,7 @@ const commandHandlers = {
     getDocuments,
     duplicateDocument,
     getDocumentImage,
+    getDocumentRegion,
     openFile,
     placeImage,
     getDocumentInfo,
@@ -31,17 +31,51 @@ const filters = require("./filters")
 const selection = require("./selection")
 const layers = require("./layers")
 
-const parseAndRouteCommands = async (commands) => {
+const parseAndRouteCommands = async (commands, stopOnError = false, context = {}) => {
+    let results = [];
+
     if (!commands.length) {
-        return;
+        return results;
     }
 
     for (let c of commands) {
-        await parseAndRouteCommand(c);
+        try {
+            //this will throw if an active document is required and not open
+            checkRequiresActiveDocument(c);
+
+            let response = await parseAndRouteCommand(c, context);
+            results.push({
+                action: c.action,
+                status: "SUCCESS",
+                response: response,
+            });
+        } catch (e) {
+            results.push({
+                action: c.action,
+                status: "FAILURE",
+                message: `Error calling ${c.action} : ${e}`,
+            });
+
+            if (stopOnError) {
+                break;
+            }
+        }
     }
+
+    return results;
+};
+
+//runs an ordered list of commands in a single packet. The document / layer
+//snapshot is taken once by onCommandPacket after the whole batch has run
+const runBatch = async (command, context) => {
+    let options = command.options;
+
+    return await parseAndRouteCommands(options.commands, options.stopOnError, context);
 };
 
-const parseAndRouteCommand = async (command) => {
+//context is passed on to the handler. context.sendChunk(chunk) sends part
+//of the response to the client before the command completes
+const parseAndRouteCommand = async (command, context = {}) => {
     let action = command.action;
 
     let f = commandHandlers[action];
@@ -51,7 +85,7 @@ const parseAndRouteCommand = async (command) => {
     }
 
     console.log(f.name)
-    return f(command);
+    return f(command, context);
 };
 
 const checkRequiresActiveDocument = (command) => {
@@ -67,7 +101,8 @@ const checkRequiresActiveDocument = (command) => {
 };
 
 const requiresActiveDocument = (command) => {
-    return !["createDocument", "openFile"].includes(command.action);
+    //runBatch checks each of its commands as it runs them
+    return !["createDocument", "openFile", "runBatch"].includes(command.action);
 };
 
 const commandHandlers = {
@@ -76,7 +111,8 @@ const commandHandlers = {
     ...core.commandHandlers,
     ...adjustmentLayers.commandHandlers,
     ...layerStyles.commandHandlers,
-    ...layers.commandHandlers
+    ...layers.commandHandlers,
+    runBatch
 };
 
 module.exports = {
@@ -21,7 +21,7 @@
  * SOFTWARE.
  */
 
-const { app, constants, action } = require("photoshop");
+const { app, constants, action, imaging } = require("photoshop");
 const fs = require("uxp").storage.localFileSystem;
 
 const {
@@ -137,6 +137,68 @@ const exportLayersAsPng = async (command) => {
     return results;
 };
 
+//reads the pixels of each layer in options.layerIds in a single modal pass,
+//and sends each one to the client as a chunk as soon as it has been read,
+//so the client can encode and save it while the next layer is read
+//
+//the pixels are the layer's own, without layer effects, as 8 bit
+//interleaved RGB(A) covering the layer's bounds
+const getLayerPixels = async (command, context) => {
+    let options = command.options;
+    let doc = app.activeDocument;
+
+    const results = [];
+
+    await execute(async () => {
+        for (const layerId of options.layerIds) {
+            try {
+                let layer = findLayer(layerId);
+
+                if (!layer) {
+                    throw new Error(
+                        `getLayerPixels : Could not find layer with ID : [${layerId}]`
+                    );
+                }
+
+                const imgObj = await imaging.getPixels({
+                    layerID: layerId,
+                    componentSize: 8,
+                    colorSpace: "RGB",
+                });
+                const imageData = imgObj.imageData;
+                const data = await imageData.getData({ chunky: true });
+
+                context.sendChunk({
+                    layerId: layerId,
+                    imageData: data,
+                    width: imageData.width,
+                    height: imageData.height,
+                    components: imageData.components,
+                    bounds: {
+                        left: imgObj.sourceBounds.left,
+                        top: imgObj.sourceBounds.top,
+                        right: imgObj.sourceBounds.right,
+                        bottom: imgObj.sourceBounds.bottom,
+                    },
+                    canvas: { width: doc.width, height: doc.height },
+                });
+
+                imageData.dispose();
+
+                results.push({ layerId: layerId, success: true });
+            } catch (e) {
+                results.push({
+                    layerId: layerId,
+                    success: false,
+                    message: e.message,
+                });
+            }
+        }
+    });
+
+    return results;
+};
+
 const scaleLayer = async (command) => {
     let options = command.options;
 
@@ -676,6 +738,7 @@ const getLayers = async (command) => {
                 let layer = layersList[i];
 
                 let kind = layer.kind.toUpperCase()
+                let b = layer.bounds
 
                 let layerInfo = {
                     name: layer.name,
@@ -684,6 +747,7 @@ const getLayers = async (command) => {
                     isClippingMask: layer.isClippingMask,
                     opacity: Math.round(layer.opacity),
                     blendMode: layer.blendMode.toUpperCase(),
+                    bounds: { left: b.left, top: b.top, bottom: b.bottom, right: b.right },
                 };
 
                 if(kind == constants.LayerKind.TEXT.toUpperCase()) {
@@ -798,6 +862,7 @@ const addLayerMask = async (command) => {
 const commandHandlers = {
     editTextLayer,
     exportLayersAsPng,
+    getLayerPixels,
     removeLayerMask,
     addLayerMask,
     getLayers,
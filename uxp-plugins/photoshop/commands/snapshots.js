@@ -0,0 +1,132 @@
+/* MIT License
+ *
+ * Copyright (c) 2025 Mike Chambers
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in all
+ * copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+ * SOFTWARE.
+ */
+
+const { getLayers } = require("./layers").commandHandlers;
+
+//identifies this run of the plugin, so revisions from an earlier run (which
+//restart at 1) are never mistaken for the current ones
+const SNAPSHOT_EPOCH = Date.now().toString(36);
+
+//last layer snapshot sent for each document, by document id
+//{revision, layers:Map(layer id -> serialized layer)}
+const documentStates = new Map();
+
+//flattens the nested getLayers tree into a list of layers, each recording
+//its parent id and position within its parent
+const flattenLayers = (layers, parentId = null, out = []) => {
+    layers.forEach((layer, index) => {
+        let { layers: children, ...info } = layer;
+        out.push({ ...info, parentId: parentId, index: index });
+
+        if (children && children.length > 0) {
+            flattenLayers(children, layer.id, out);
+        }
+    });
+
+    return out;
+};
+
+//returns the layers of the document, either as the full tree or, when the
+//client already has the previous revision, as the layers added, changed or
+//removed since then
+//
+//knownRevision is the snapshotRevision the client last received
+const getLayersSnapshot = async (document, knownRevision) => {
+    let tree = await getLayers();
+    let flat = flattenLayers(tree);
+
+    let layers = new Map();
+    for (const l of flat) {
+        layers.set(l.id, JSON.stringify(l));
+    }
+
+    let state = documentStates.get(document.id);
+
+    let added = [];
+    let changed = [];
+    let removed = [];
+
+    if (state) {
+        for (const l of flat) {
+            if (!state.layers.has(l.id)) {
+                added.push(l);
+            } else if (state.layers.get(l.id) !== layers.get(l.id)) {
+                changed.push(l);
+            }
+        }
+
+        for (const id of state.layers.keys()) {
+            if (!layers.has(id)) {
+                removed.push(id);
+            }
+        }
+    }
+
+    let revision = 1;
+    if (state) {
+        let modified = added.length || changed.length || removed.length;
+        revision = modified ? state.revision + 1 : state.revision;
+    }
+
+    documentStates.set(document.id, { revision, layers });
+
+    let out = {
+        snapshotRevision: {
+            documentId: document.id,
+            epoch: SNAPSHOT_EPOCH,
+            revision: revision,
+        },
+    };
+
+    let known =
+        knownRevision &&
+        knownRevision.documentId === document.id &&
+        knownRevision.epoch === SNAPSHOT_EPOCH
+            ? knownRevision.revision
+            : null;
+
+    if (state && known === revision) {
+        out.layersDelta = {
+            baseRevision: revision,
+            added: [],
+            changed: [],
+            removed: [],
+        };
+    } else if (state && known === state.revision) {
+        out.layersDelta = {
+            baseRevision: state.revision,
+            added,
+            changed,
+            removed,
+        };
+    } else {
+        out.layers = tree;
+    }
+
+    return out;
+};
+
+module.exports = {
+    getLayersSnapshot,
+    flattenLayers,
+};
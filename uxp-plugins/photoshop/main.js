@@ -29,7 +29,8 @@ const {
 
 const { hasActiveSelection, generateDocumentInfo } = require("./commands/utils.js");
 
-const { getLayers } = require("./commands/layers.js").commandHandlers;
+const { getLayersSnapshot } = require("./commands/snapshots.js");
+const { getDocumentInfo } = require("./commands/core.js").commandHandlers;
 
 const { io } = require("./socket.io.js");
 //const { act } = require("react");
@@ -45,24 +46,48 @@ const onCommandPacket = async (packet) => {
 
     let out = {
         senderId: packet.senderId,
+        requestId: packet.requestId,
     };
 
     try {
         //this will throw if an active document is required and not open
         checkRequiresActiveDocument(command);
 
-        let response = await parseAndRouteCommand(command);
+        let response = await parseAndRouteCommand(command, {
+            sendChunk: (chunk) => {
+                sendChunkPacket({
+                    senderId: packet.senderId,
+                    requestId: packet.requestId,
+                    chunk: chunk,
+                });
+            },
+        });
 
         out.response = response;
         out.status = "SUCCESS";
 
+        //how much document state to send back with the response:
+        //none, summary (document info and selection) or full (plus layers)
+        let snapshotMode = command.snapshot || "full";
+
         let activeDocument = app.activeDocument
-        let doc = generateDocumentInfo(activeDocument, activeDocument)
-        out.document = doc;
 
-        out.layers = await getLayers();
+        if (snapshotMode !== "none" && activeDocument) {
+            let doc = generateDocumentInfo(activeDocument, activeDocument)
+            out.document = doc;
+            out.documentInfo = await getDocumentInfo();
+            out.hasActiveSelection = hasActiveSelection();
+        }
 
-        out.hasActiveSelection = hasActiveSelection();
+        if (snapshotMode === "full" && activeDocument) {
+            //full layer tree, or only the changes if the client already has
+            //the previous revision
+            let snapshot = await getLayersSnapshot(
+                activeDocument,
+                command.snapshotRevision
+            );
+            Object.assign(out, snapshot);
+        }
     } catch (e) {
         out.status = "FAILURE";
         out.message = `Error calling ${command.action} : ${e}`;
@@ -127,6 +152,17 @@ function sendResponsePacket(packet) {
     return false;
 }
 
+//sends part of a response before the command has completed
+function sendChunkPacket(packet) {
+    if (socket && socket.connected) {
+        socket.emit("command_packet_chunk", {
+            packet: packet,
+        });
+        return true;
+    }
+    return false;
+}
+
 function sendCommand(command) {
     if (socket && socket.connected) {
         socket.emit("app_command", {
@@ -528,32 +528,37 @@ const getSequences = async () => {
 
     let out = []
     for(const sequence of sequences) {
-        let size = await sequence.getFrameSize()
-        //let settings = await sequence.getSettings()
-    
-        //let projectItem = await sequence.getProjectItem()
-        //let name = projectItem.name
-        let name = sequence.name
-        let id = sequence.guid.toString()
-    
-        let videoTracks = await getVideoTracks(sequence)
-        let audioTracks = await getAudioTracks(sequence)
-    
-        let isActive = active == sequence
+        let info = await getSequenceInfo(sequence)
+        info.isActive = active == sequence
 
-        out.push( {
-            isActive,
-            name,
-            id,
-            frameSize:{width:size.width, height:size.height},
-            videoTracks,
-            audioTracks
-        })
+        out.push(info)
     }
 
     return out
 }
 
+//returns info on a single sequence and all of its clips, without isActive
+const getSequenceInfo = async (sequence) => {
+    let size = await sequence.getFrameSize()
+    //let settings = await sequence.getSettings()
+
+    //let projectItem = await sequence.getProjectItem()
+    //let name = projectItem.name
+    let name = sequence.name
+    let id = sequence.guid.toString()
+
+    let videoTracks = await getVideoTracks(sequence)
+    let audioTracks = await getAudioTracks(sequence)
+
+    return {
+        name,
+        id,
+        frameSize:{width:size.width, height:size.height},
+        videoTracks,
+        audioTracks
+    }
+}
+
 const getVideoTracks = async (sequence) => {
     let videoCount = await sequence.getVideoTrackCount()
 
@@ -694,6 +699,12 @@ const openProject = async (command) => {
     await app.Project.open(filePath);    
 }
 
+//the sequences themselves are sent back by the snapshot that follows every
+//command, so there is nothing else to return here
+const refreshSequences = async (command) => {
+    return {}
+}
+
 const parseAndRouteCommand = async (command) => {
     let action = command.action;
 
@@ -712,6 +723,7 @@ const commandHandlers = {
     saveProjectAs,
     saveProject,
     getProjectInfo,
+    getSequences:refreshSequences,
     setActiveSequence,
     exportFrame,
     setVideoClipProperties,
@@ -745,6 +757,7 @@ const requiresActiveProject = (command) => {
 
 module.exports = {
     getSequences,
+    getSequenceInfo,
     getProjectContentInfo,
     getAudioTracks,
     getVideoTracks,
@@ -0,0 +1,146 @@
+/* MIT License
+ *
+ * Copyright (c) 2025 Mike Chambers
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in all
+ * copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+ * SOFTWARE.
+ */
+
+
+const app = require("premierepro");
+const { getSequenceInfo } = require("./index.js");
+
+//identifies this run of the plugin, so revisions from an earlier run (which
+//restart at 1) are never mistaken for the current ones
+const SNAPSHOT_EPOCH = Date.now().toString(36);
+
+//last sequence snapshot sent for each project, by project id
+//{revision, sequences:Map(sequence id -> serialized sequence), activeSequenceId}
+const projectStates = new Map();
+
+//returns the sequences of the active project, either as the full list or,
+//when the client already has the previous revision, as the sequences that
+//changed since then
+//
+//Walking every clip of every sequence is slow on long projects, so when the
+//client is current only the sequences the command names (and any new ones)
+//are walked. A full walk is done for getSequences, or when the client does
+//not have the current revision.
+const getSequencesSnapshot = async (command) => {
+    let project = await app.Project.getActiveProject();
+    let projectId = project.guid.toString();
+
+    let active = await project.getActiveSequence();
+    let activeSequenceId = active ? active.guid.toString() : null;
+
+    let sequences = await project.getSequences();
+    let ids = sequences.map((s) => s.guid.toString());
+
+    let state = projectStates.get(projectId);
+    let known = command.snapshotRevision;
+
+    let current =
+        state &&
+        known &&
+        known.documentId === projectId &&
+        known.epoch === SNAPSHOT_EPOCH &&
+        known.revision === state.revision;
+
+    let complete = !current || command.action === "getSequences";
+
+    let options = command.options || {};
+    let touched = options.sequenceId ? [options.sequenceId] : [];
+
+    let serialized = complete ? new Map() : new Map(state.sequences);
+    let changed = [];
+
+    for (const sequence of sequences) {
+        let id = sequence.guid.toString();
+
+        if (!complete && !touched.includes(id) && serialized.has(id)) {
+            continue;
+        }
+
+        let info = await getSequenceInfo(sequence);
+        let json = JSON.stringify(info);
+
+        if (!state || state.sequences.get(id) !== json) {
+            changed.push(info);
+        }
+        serialized.set(id, json);
+    }
+
+    let removed = [];
+    for (const id of [...serialized.keys()]) {
+        if (!ids.includes(id)) {
+            serialized.delete(id);
+        }
+    }
+    if (state) {
+        removed = [...state.sequences.keys()].filter((id) => !ids.includes(id));
+    }
+
+    let revision = 1;
+    if (state) {
+        let modified =
+            changed.length ||
+            removed.length ||
+            state.activeSequenceId !== activeSequenceId;
+        revision = modified ? state.revision + 1 : state.revision;
+    }
+
+    projectStates.set(projectId, {
+        revision,
+        sequences: serialized,
+        activeSequenceId,
+    });
+
+    let out = {
+        snapshotRevision: {
+            documentId: projectId,
+            epoch: SNAPSHOT_EPOCH,
+            revision: revision,
+        },
+    };
+
+    if (current) {
+        out.sequencesDelta = {
+            baseRevision: state.revision,
+            order: ids,
+            activeSequenceId,
+            changed,
+            removed,
+            //whether every sequence was checked, rather than only the
+            //ones the command touched
+            complete,
+        };
+    } else {
+        out.sequences = ids.map((id) => {
+            return {
+                ...JSON.parse(serialized.get(id)),
+                isActive: id === activeSequenceId,
+            };
+        });
+    }
+
+    return out;
+};
+
+module.exports = {
+    getSequencesSnapshot,
+};
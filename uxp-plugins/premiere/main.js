@@ -26,7 +26,6 @@ const { io } = require("./socket.io.js");
 const app = require("premierepro");
 
 const {
-    getSequences,
     getProjectContentInfo,
     getAudioTracks,
     getVideoTracks,
@@ -34,6 +33,8 @@ const {
     checkRequiresActiveProject,
 } = require("./commands/index.js");
 
+const { getSequencesSnapshot } = require("./commands/snapshots.js");
+
 const APPLICATION = "premiere";
 const PROXY_URL = "http://localhost:3001";
 
@@ -44,6 +45,7 @@ const onCommandPacket = async (packet) => {
 
     let out = {
         senderId: packet.senderId,
+        requestId: packet.requestId,
     };
 
     try {
@@ -54,8 +56,21 @@ const onCommandPacket = async (packet) => {
 
         out.response = response;
         out.status = "SUCCESS";
-        out.sequences = await getSequences();
-        out.projectItems = await getProjectContentInfo();
+
+        //how much project state to send back with the response:
+        //none, summary (project items) or full (plus sequences)
+        let snapshotMode = command.snapshot || "full";
+
+        if (snapshotMode === "full") {
+            //the sequences the command touched, or all of them if the
+            //client does not have the previous revision
+            let snapshot = await getSequencesSnapshot(command);
+            Object.assign(out, snapshot);
+        }
+
+        if (snapshotMode !== "none") {
+            out.projectItems = await getProjectContentInfo();
+        }
         
     } catch (e) {
         out.status = "FAILURE";